@@ -58,50 +58,49 @@ def uptime():
 
 
 def mem_usage():
-    with open('/proc/meminfo') as fp:
-        for line in fp:
-            line = line.strip()
-            if line.startswith("MemTotal:"):
-                kb_mem_total = int(line.split()[1])
-            if line.startswith("MemFree:"):
-                kb_mem_free = int(line.split()[1])
-            if line.startswith("Buffers:"):
-                kb_main_buffers = int(line.split()[1])
-            if line.startswith("Cached:"):
-                kb_main_cached = int(line.split()[1])
-        kb_mem_used = kb_mem_total - kb_mem_free - kb_main_cached - kb_main_buffers
-        return round(kb_mem_used / kb_mem_total, 1)
-
-    return 0
+    from pwnagotchi import metrics
+    if metrics.sampler is not None:
+        usage = metrics.sampler.latest('mem')
+        if usage is not None:
+            return usage
+
+    return metrics._read_mem_usage()
 
 
 def _cpu_stat():
     """
     Returns the splitted first line of the /proc/stat file
     """
-    with open('/proc/stat', 'rt') as fp:
-        return list(map(int,fp.readline().split()[1:]))
+    from pwnagotchi import metrics
+    return metrics._read_cpu_stat()
 
 
 def cpu_load():
     """
     Returns the current cpuload
     """
+    from pwnagotchi import metrics
+    if metrics.sampler is not None:
+        load = metrics.sampler.latest('cpu')
+        if load is not None:
+            return load
+
+    # no sampler running (yet), measure it the slow way
     parts0 = _cpu_stat()
     time.sleep(0.1)
     parts1 = _cpu_stat()
-    parts_diff = [p1 - p0 for (p0, p1) in zip(parts0, parts1)]
-    user, nice, sys, idle, iowait, irq, softirq, steal, _guest, _guest_nice = parts_diff
-    idle_sum = idle + iowait
-    non_idle_sum = user + nice + sys + irq + softirq + steal
-    total = idle_sum + non_idle_sum
-    return non_idle_sum / total
+    return metrics._cpu_load_between(parts0, parts1)
 
 
 def temperature(celsius=True):
-    with open('/sys/class/thermal/thermal_zone0/temp', 'rt') as fp:
-        temp = int(fp.read().strip())
-    c = int(temp / 1000)
+    from pwnagotchi import metrics
+    temp = None
+    if metrics.sampler is not None:
+        temp = metrics.sampler.latest('temp')
+    if temp is None:
+        temp = metrics._read_temperature()
+
+    c = int(temp)
     return c if celsius else ((c * (9 / 5)) + 32)
 
 
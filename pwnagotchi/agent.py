@@ -9,11 +9,14 @@ import _thread
 import pwnagotchi
 import pwnagotchi.utils as utils
 import pwnagotchi.plugins as plugins
+import pwnagotchi.handshakes as handshakes
 from pwnagotchi.ui.web.server import Server
 from pwnagotchi.automata import Automata
 from pwnagotchi.log import LastSession
-from pwnagotchi.bettercap import Client
+from pwnagotchi.bettercap import Client, AsyncClient
+from pwnagotchi.history import InteractionHistory
 from pwnagotchi.mesh.utils import AsyncAdvertiser
+from pwnagotchi.mesh.wifi import AccessPointTable
 from pwnagotchi.ai.train import AsyncTrainer
 
 RECOVERY_DATA_FILE = '/root/.pwnagotchi-recovery'
@@ -25,7 +28,16 @@ class Agent(Client, Automata, AsyncAdvertiser, AsyncTrainer):
                         config['bettercap']['scheme'],
                         config['bettercap']['port'],
                         config['bettercap']['username'],
-                        config['bettercap']['password'])
+                        config['bettercap']['password'],
+                        connect_timeout=config['bettercap']['connect_timeout'],
+                        read_timeout=config['bettercap']['read_timeout'],
+                        pool_size=config['bettercap']['pool_size'],
+                        retries=config['bettercap']['retries'],
+                        backoff=config['bettercap']['backoff'],
+                        session_ttl=config['bettercap']['session_ttl'])
+        # the event loop and the attacks use this one, so that they don't wait on each request
+        self._async = AsyncClient(self)
+        self._loop = None
         Automata.__init__(self, config, view)
         AsyncAdvertiser.__init__(self, config, view, keypair)
         AsyncTrainer.__init__(self, config)
@@ -41,9 +53,15 @@ class Agent(Client, Automata, AsyncAdvertiser, AsyncTrainer):
         self._web_ui = Server(self, config['ui'])
 
         self._access_points = []
+        self._ap_table = AccessPointTable()
+        self._session_table = (None, AccessPointTable())
+        self._filtered_version = None
+        self._filtered_aps = []
+        self._filtered_table = AccessPointTable()
         self._last_pwnd = None
-        self._history = {}
-        self._handshakes = {}
+        self._history = InteractionHistory(max_entries=config['personality']['history_max_entries'],
+                                           ttl=config['personality']['history_ttl'])
+        self._handshakes = handshakes.HandshakeRegistry()
         self.last_session = LastSession(self._config)
         self.mode = 'auto'
 
@@ -74,12 +92,14 @@ class Agent(Client, Automata, AsyncAdvertiser, AsyncTrainer):
 
     def _reset_wifi_settings(self):
         mon_iface = self._config['main']['iface']
-        self.run('set wifi.interface %s' % mon_iface)
-        self.run('set wifi.ap.ttl %d' % self._config['personality']['ap_ttl'])
-        self.run('set wifi.sta.ttl %d' % self._config['personality']['sta_ttl'])
-        self.run('set wifi.rssi.min %d' % self._config['personality']['min_rssi'])
-        self.run('set wifi.handshakes.file %s' % self._config['bettercap']['handshakes'])
-        self.run('set wifi.handshakes.aggregate false')
+        self.run_many([
+            'set wifi.interface %s' % mon_iface,
+            'set wifi.ap.ttl %d' % self._config['personality']['ap_ttl'],
+            'set wifi.sta.ttl %d' % self._config['personality']['sta_ttl'],
+            'set wifi.rssi.min %d' % self._config['personality']['min_rssi'],
+            'set wifi.handshakes.file %s' % self._config['bettercap']['handshakes'],
+            'set wifi.handshakes.aggregate false'
+        ])
 
     def start_monitor_mode(self):
         mon_iface = self._config['main']['iface']
@@ -169,31 +189,46 @@ class Agent(Client, Automata, AsyncAdvertiser, AsyncTrainer):
                self._filter.match(ap['hostname']) is not None or \
                self._filter.match(ap['mac']) is not None
 
-    def set_access_points(self, aps):
+    def set_access_points(self, aps, table=None):
+        # the table can be passed along when it's already been built for these aps
+        self._ap_table = table if table is not None else AccessPointTable(aps)
         self._access_points = aps
         plugins.on('wifi_update', self, aps)
-        self._epoch.observe(aps, list(self._peers.values()))
+        self._epoch.observe(self._ap_table, list(self._peers.values()))
         return self._access_points
 
-    def get_access_points(self):
+    def get_access_points_table(self):
+        return self._ap_table
+
+    def _filter_access_points(self, s):
         whitelist = self._config['main']['whitelist']
         aps = []
+        for ap in s['wifi']['aps']:
+            if ap['encryption'] == '' or ap['encryption'] == 'OPEN':
+                continue
+            elif ap['hostname'] not in whitelist \
+                    and ap['mac'].lower() not in whitelist \
+                    and ap['mac'][:8].lower() not in whitelist:
+                if self._filter_included(ap):
+                    aps.append(ap)
+        aps.sort(key=lambda ap: ap['channel'])
+        return aps
+
+    def get_access_points(self):
+        aps, table = [], None
         try:
-            s = self.session()
+            version, s = self.session_snapshot()
             plugins.on("unfiltered_ap_list", self, s['wifi']['aps'])
-            for ap in s['wifi']['aps']:
-                if ap['encryption'] == '' or ap['encryption'] == 'OPEN':
-                    continue
-                elif ap['hostname'] not in whitelist \
-                        and ap['mac'].lower() not in whitelist \
-                        and ap['mac'][:8].lower() not in whitelist:
-                    if self._filter_included(ap):
-                        aps.append(ap)
+            # same snapshot as last time, no need to filter and index it again
+            if version is None or version != self._filtered_version:
+                self._filtered_aps = self._filter_access_points(s)
+                self._filtered_table = AccessPointTable(self._filtered_aps)
+                self._filtered_version = version
+            aps, table = list(self._filtered_aps), self._filtered_table
         except Exception as e:
             logging.exception("Error while getting acces points (%s)", e)
 
-        aps.sort(key=lambda ap: ap['channel'])
-        return self.set_access_points(aps)
+        return self.set_access_points(aps, table)
 
     def get_total_aps(self):
         return self._tot_aps
@@ -205,50 +240,47 @@ class Agent(Client, Automata, AsyncAdvertiser, AsyncTrainer):
         return self._current_channel
 
     def get_access_points_by_channel(self):
-        aps = self.get_access_points()
+        self.get_access_points()
         channels = self._config['personality']['channels']
-        grouped = {}
-
-        # group by channel
-        for ap in aps:
-            ch = ap['channel']
-            # if we're sticking to a channel, skip anything
-            # which is not on that channel
-            if channels and ch not in channels:
-                continue
+        # if we're sticking to a channel, skip anything
+        # which is not on that channel
+        grouped = [(ch, aps) for ch, aps in self._ap_table.by_channel() if not channels or ch in channels]
+        # sort by more populated channels
+        return sorted(grouped, key=lambda kv: len(kv[1]), reverse=True)
 
-            if ch not in grouped:
-                grouped[ch] = [ap]
-            else:
-                grouped[ch].append(ap)
+    def _find_ap_sta_in(self, station_mac, ap_mac, table):
+        ap_and_station = table.station(ap_mac, station_mac)
+        if ap_and_station is not None:
+            return ap_and_station
 
-        # sort by more populated channels
-        return sorted(grouped.items(), key=lambda kv: len(kv[1]), reverse=True)
-
-    def _find_ap_sta_in(self, station_mac, ap_mac, session):
-        for ap in session['wifi']['aps']:
-            if ap['mac'] == ap_mac:
-                for sta in ap['clients']:
-                    if sta['mac'] == station_mac:
-                        return (ap, sta)
-                return (ap, {'mac': station_mac, 'vendor': ''})
+        ap = table.ap(ap_mac)
+        if ap is not None:
+            return (ap, {'mac': station_mac, 'vendor': ''})
         return None
 
+    def _get_session_table(self, version, s):
+        # index of the unfiltered session, rebuilt only when the snapshot changes
+        table_version, table = self._session_table
+        if version is None or version != table_version:
+            table = AccessPointTable(s['wifi']['aps'])
+            self._session_table = (version, table)
+        return table
+
     def _update_uptime(self, s):
         secs = pwnagotchi.uptime()
         self._view.set('uptime', utils.secs_to_hhmmss(secs))
         # self._view.set('epoch', '%04d' % self._epoch.epoch)
 
     def _update_counters(self):
-        self._tot_aps = len(self._access_points)
-        tot_stas = sum(len(ap['clients']) for ap in self._access_points)
+        table = self._ap_table
+        self._tot_aps = len(table)
+        tot_stas = table.num_stations
         if self._current_channel == 0:
             self._view.set('aps', '%d' % self._tot_aps)
             self._view.set('sta', '%d' % tot_stas)
         else:
-            self._aps_on_channel = len([ap for ap in self._access_points if ap['channel'] == self._current_channel])
-            stas_on_channel = sum(
-                [len(ap['clients']) for ap in self._access_points if ap['channel'] == self._current_channel])
+            self._aps_on_channel = table.aps_on_channel(self._current_channel)
+            stas_on_channel = table.stations_on_channel(self._current_channel)
             self._view.set('aps', '%d (%d)' % (self._aps_on_channel, self._tot_aps))
             self._view.set('sta', '%d (%d)' % (stas_on_channel, tot_stas))
 
@@ -281,8 +313,8 @@ class Agent(Client, Automata, AsyncAdvertiser, AsyncTrainer):
             data = {
                 'started_at': self._started_at,
                 'epoch': self._epoch.epoch,
-                'history': self._history,
-                'handshakes': self._handshakes,
+                'history': self._history.to_dict(),
+                'handshakes': self._handshakes.to_dict(),
                 'last_pwnd': self._last_pwnd
             }
             json.dump(data, fp)
@@ -294,8 +326,8 @@ class Agent(Client, Automata, AsyncAdvertiser, AsyncTrainer):
                 logging.info("found recovery data: %s", data)
                 self._started_at = data['started_at']
                 self._epoch.epoch = data['epoch']
-                self._handshakes = data['handshakes']
-                self._history = data['history']
+                self._handshakes = handshakes.HandshakeRegistry(data['handshakes'])
+                self._history.load(data['history'])
                 self._last_pwnd = data['last_pwnd']
 
                 if delete:
@@ -328,11 +360,11 @@ class Agent(Client, Automata, AsyncAdvertiser, AsyncTrainer):
             filename = jmsg['data']['file']
             sta_mac = jmsg['data']['station']
             ap_mac = jmsg['data']['ap']
-            key = "%s -> %s" % (sta_mac, ap_mac)
-            if key not in self._handshakes:
-                self._handshakes[key] = jmsg
-                s = self.session()
-                ap_and_station = self._find_ap_sta_in(sta_mac, ap_mac, s)
+            key = handshakes.HandshakeRegistry.key(sta_mac, ap_mac)
+            handshakes.store_for(self._config['bettercap']['handshakes']).add(filename)
+            if self._handshakes.add(sta_mac, ap_mac, jmsg):
+                version, s = await self._async.session_snapshot()
+                ap_and_station = self._find_ap_sta_in(sta_mac, ap_mac, self._get_session_table(version, s))
                 if ap_and_station is None:
                     logging.warning("!!! captured new handshake: %s !!!", key)
                     self._last_pwnd = ap_mac
@@ -353,7 +385,7 @@ class Agent(Client, Automata, AsyncAdvertiser, AsyncTrainer):
 
     def _event_poller(self, loop):
         self._load_recovery_data()
-        self.run('events.clear')
+        loop.run_until_complete(self._async.run('events.clear'))
 
         while True:
             logging.debug("polling events ...")
@@ -365,7 +397,14 @@ class Agent(Client, Automata, AsyncAdvertiser, AsyncTrainer):
 
     def start_event_polling(self):
         # start a thread and pass in the mainloop
-        _thread.start_new_thread(self._event_poller, (asyncio.get_event_loop(),))
+        self._loop = asyncio.get_event_loop()
+        _thread.start_new_thread(self._event_poller, (self._loop,))
+
+    def _await(self, coro):
+        # runs the coroutine on the event loop if it's up, on a loop of its own otherwise
+        if self._loop is not None and self._loop.is_running():
+            return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+        return asyncio.run(coro)
 
 
     def is_module_running(self, module):
@@ -379,26 +418,71 @@ class Agent(Client, Automata, AsyncAdvertiser, AsyncTrainer):
         self.run('%s on' % module)
 
     def restart_module(self, module):
-        self.run('%s off; %s on' % (module, module))
+        self.run_many(['%s off' % module, '%s on' % module])
 
     def _has_handshake(self, bssid):
-        for key in self._handshakes:
-            if bssid.lower() in key:
-                return True
-        return False
+        return self._handshakes.has(bssid)
 
     def _should_interact(self, who):
         if self._has_handshake(who):
             return False
 
-        elif who not in self._history:
-            self._history[who] = 1
-            return True
+        interactions = self._history.hit(who)
+        # always interact the first time we see it
+        return interactions == 1 or interactions < self._config['personality']['max_interactions']
 
-        else:
-            self._history[who] += 1
+    def _log_assoc(self, ap):
+        logging.info("sending association frame to %s (%s %s) on channel %d [%d clients], %d dBm...",
+            ap['hostname'], ap['mac'], ap['vendor'], ap['channel'], len(ap['clients']), ap['rssi'])
+
+    def _log_deauth(self, ap, sta):
+        logging.info("deauthing %s (%s) from %s (%s %s) on channel %d, %d dBm ...",
+            sta['mac'], sta['vendor'], ap['hostname'], ap['mac'], ap['vendor'], ap['channel'], ap['rssi'])
+
+    def attack(self, ap, throttle=0):
+        """
+        Same as associate(ap) followed by deauth(ap, sta) for each of its client stations, but the
+        commands are sent to bettercap concurrently instead of waiting for each response in turn.
+        """
+        if self.is_stale():
+            logging.debug("recon is stale, skipping attack(%s)", ap['mac'])
+            return
+
+        stations = ap['clients'] if self._config['personality']['deauth'] else []
+        targets = [None] if self._config['personality']['associate'] and self._should_interact(ap['mac']) else []
+        targets += [sta for sta in stations if self._should_interact(sta['mac'])]
+        if not targets:
+            return
+
+        commands = []
+        for sta in targets:
+            if sta is None:
+                self._view.on_assoc(ap)
+                self._log_assoc(ap)
+                commands.append('wifi.assoc %s' % ap['mac'])
+            else:
+                self._view.on_deauth(sta)
+                self._log_deauth(ap, sta)
+                commands.append('wifi.deauth %s' % sta['mac'])
+
+        results = self._await(self._async.run_all(commands))
+
+        for sta, result in zip(targets, results):
+            if isinstance(result, Exception):
+                self._on_error(ap['mac'] if sta is None else sta['mac'], result)
+            elif sta is None:
+                self._epoch.track(assoc=True)
+            else:
+                self._epoch.track(deauth=True)
+
+            if sta is None:
+                plugins.on('association', self, ap)
+            else:
+                plugins.on('deauthentication', self, ap, sta)
 
-        return self._history[who] < self._config['personality']['max_interactions']
+        if throttle > 0:
+            time.sleep(throttle)
+        self._view.on_normal()
 
     def associate(self, ap, throttle=0):
         if self.is_stale():
@@ -409,8 +493,7 @@ class Agent(Client, Automata, AsyncAdvertiser, AsyncTrainer):
             self._view.on_assoc(ap)
 
             try:
-                logging.info("sending association frame to %s (%s %s) on channel %d [%d clients], %d dBm...",
-                    ap['hostname'], ap['mac'], ap['vendor'], ap['channel'], len(ap['clients']), ap['rssi'])
+                self._log_assoc(ap)
                 self.run('wifi.assoc %s' % ap['mac'])
                 self._epoch.track(assoc=True)
             except Exception as e:
@@ -430,8 +513,7 @@ class Agent(Client, Automata, AsyncAdvertiser, AsyncTrainer):
             self._view.on_deauth(sta)
 
             try:
-                logging.info("deauthing %s (%s) from %s (%s %s) on channel %d, %d dBm ...",
-                    sta['mac'], sta['vendor'], ap['hostname'], ap['mac'], ap['vendor'], ap['channel'], ap['rssi'])
+                self._log_deauth(ap, sta)
                 self.run('wifi.deauth %s' % sta['mac'])
                 self._epoch.track(deauth=True)
             except Exception as e:
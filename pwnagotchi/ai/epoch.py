@@ -92,19 +92,20 @@ class Epoch(object):
         self.tot_bond_factor = sum((peer.encounters for peer in peers)) / bond_unit_scale
         self.avg_bond_factor = self.tot_bond_factor / num_peers
 
-        num_aps = len(aps) + 1e-10
-        num_sta = sum(len(ap['clients']) for ap in aps) + 1e-10
+        table = aps if isinstance(aps, wifi.AccessPointTable) else wifi.AccessPointTable(aps)
+        num_aps = len(table) + 1e-10
+        num_sta = table.num_stations + 1e-10
         aps_per_chan = [0.0] * wifi.NumChannels
         sta_per_chan = [0.0] * wifi.NumChannels
         peers_per_chan = [0.0] * wifi.NumChannels
 
-        for ap in aps:
-            ch_idx = ap['channel'] - 1
+        for ch in table.channels():
+            ch_idx = ch - 1
             try:
-                aps_per_chan[ch_idx] += 1.0
-                sta_per_chan[ch_idx] += len(ap['clients'])
+                aps_per_chan[ch_idx] += table.aps_on_channel(ch)
+                sta_per_chan[ch_idx] += table.stations_on_channel(ch)
             except IndexError:
-                logging.error("got data on channel %d, we can store %d channels" % (ap['channel'], wifi.NumChannels))
+                logging.error("got data on channel %d, we can store %d channels" % (ch, wifi.NumChannels))
 
         for peer in peers:
             try:
@@ -140,9 +140,11 @@ class AsyncTrainer(object):
             else:
                 logging.error("[ai] param %s not in personality configuration!" % name)
 
-        self.run('set wifi.ap.ttl %d' % self._config['personality']['ap_ttl'])
-        self.run('set wifi.sta.ttl %d' % self._config['personality']['sta_ttl'])
-        self.run('set wifi.rssi.min %d' % self._config['personality']['min_rssi'])
+        self.run_many([
+            'set wifi.ap.ttl %d' % self._config['personality']['ap_ttl'],
+            'set wifi.sta.ttl %d' % self._config['personality']['sta_ttl'],
+            'set wifi.rssi.min %d' % self._config['personality']['min_rssi']
+        ])
 
     def on_ai_ready(self):
         self._view.on_ai_ready()
@@ -1,9 +1,15 @@
-import json
+import asyncio
+import functools
 import logging
+import time
+import threading
 import requests
 import websockets
+from concurrent.futures import ThreadPoolExecutor
 
+from requests.adapters import HTTPAdapter
 from requests.auth import HTTPBasicAuth
+from urllib3.util.retry import Retry
 
 
 def decode(r, verbose_errors=True):
@@ -20,8 +26,23 @@ def decode(r, verbose_errors=True):
         return r.text
 
 
+def pipeline(commands):
+    """
+    Joins a list of commands so that bettercap runs them in order within a single request
+    """
+    return '; '.join(cmd.strip().rstrip(';') for cmd in commands if cmd.strip() != '')
+
+
+class _Flight(object):
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
 class Client(object):
-    def __init__(self, hostname='localhost', scheme='http', port=8081, username='user', password='pass'):
+    def __init__(self, hostname='localhost', scheme='http', port=8081, username='user', password='pass',
+                 connect_timeout=5.0, read_timeout=30.0, pool_size=4, retries=3, backoff=0.2, session_ttl=1.0):
         self.hostname = hostname
         self.scheme = scheme
         self.port = port
@@ -30,10 +51,158 @@ class Client(object):
         self.url = "%s://%s:%d/api" % (scheme, hostname, port)
         self.websocket = "ws://%s:%s@%s:%d/api" % (username, password, hostname, port)
         self.auth = HTTPBasicAuth(username, password)
+        self.timeout = (connect_timeout, read_timeout)
+        self.pool_size = pool_size
+
+        # one keep-alive session shared by every caller, so that polling the
+        # api doesn't open a new tcp connection for each request
+        self._http = requests.Session()
+        self._http.auth = self.auth
+        # only connection errors are retried, we don't want to send the same
+        # command twice if bettercap received it already
+        self._adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size,
+                                    max_retries=Retry(total=retries, connect=retries, read=0, status=0,
+                                                      backoff_factor=backoff))
+        self._http.mount("%s://" % scheme, self._adapter)
+
+        self._api_stats_lock = threading.Lock()
+        self._api_stats = {
+            'requests': 0,
+            'errors': 0,
+            'latency_tot': 0.0,
+            'latency_max': 0.0,
+            'latency_last': 0.0,
+        }
+
+        # the /api/session snapshot is shared by every caller for session_ttl
+        # seconds, concurrent callers wait for the same in-flight request
+        self.session_ttl = session_ttl
+        self._session_lock = threading.Lock()
+        self._session_flight = None
+        self._session_data = None
+        self._session_raw = None
+        self._session_at = 0
+        self._session_generation = 0
+        self._session_version = 0
+
+    def _request(self, method, path, **kwargs):
+        started = time.time()
+        try:
+            return self._http.request(method, "%s%s" % (self.url, path), timeout=self.timeout, **kwargs)
+        except Exception:
+            with self._api_stats_lock:
+                self._api_stats['errors'] += 1
+            raise
+        finally:
+            elapsed = time.time() - started
+            with self._api_stats_lock:
+                self._api_stats['requests'] += 1
+                self._api_stats['latency_tot'] += elapsed
+                self._api_stats['latency_last'] = elapsed
+                if elapsed > self._api_stats['latency_max']:
+                    self._api_stats['latency_max'] = elapsed
+
+    def _connections(self):
+        # urllib3 counts every (re)connection each pool had to open, if the
+        # session is reused properly this stays close to the pool size
+        # while the number of requests keeps growing
+        pools = self._adapter.poolmanager.pools
+        total = 0
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is not None:
+                total += pool.num_connections
+        return total
+
+    def api_stats(self):
+        with self._api_stats_lock:
+            stats = dict(self._api_stats)
+        stats['connections'] = self._connections()
+        stats['latency_avg'] = stats['latency_tot'] / stats['requests'] if stats['requests'] else 0.0
+        return stats
+
+    def session_version(self):
+        """
+        Returns a number that is incremented every time the session snapshot changes
+        """
+        with self._session_lock:
+            return self._session_version
+
+    def invalidate_session(self):
+        with self._session_lock:
+            self._session_at = 0
+            self._session_generation += 1
+            # callers from now on shouldn't join a request started before the invalidation
+            self._session_flight = None
+
+    def _fetch_session(self):
+        with self._session_lock:
+            generation = self._session_generation
+
+        started = time.time()
+        r = self._request('GET', "/session")
+        with self._session_lock:
+            # nothing changed, skip decoding the whole thing again
+            if r.status_code == 200 and self._session_data is not None and r.content == self._session_raw:
+                if generation == self._session_generation:
+                    self._session_at = max(self._session_at, started)
+                return self._session_version, self._session_data
+
+        data = decode(r)
+        if not isinstance(data, dict):
+            # not a session, don't keep it around for the other callers
+            return None, data
+
+        with self._session_lock:
+            # a newer snapshot could have been stored while we were decoding
+            if generation == self._session_generation and started > self._session_at:
+                self._session_data = data
+                self._session_raw = r.content
+                self._session_at = started
+                self._session_version += 1
+                return self._session_version, data
+            # the current version belongs to another snapshot
+            return None, data
+
+    def session_snapshot(self, max_age=None):
+        """
+        Returns a (version, session) tuple, the session object is shared among callers and must not be modified.
+        The version is None when the session hasn't been cached, anything keyed on it must be rebuilt.
 
-    def session(self):
-        r = requests.get("%s/session" % self.url, auth=self.auth)
-        return decode(r)
+        max_age: maximum age in seconds of a cached snapshot, defaults to session_ttl
+        """
+        max_age = self.session_ttl if max_age is None else max_age
+
+        with self._session_lock:
+            if self._session_data is not None and (time.time() - self._session_at) < max_age:
+                return self._session_version, self._session_data
+
+            flight = self._session_flight
+            leader = flight is None
+            if leader:
+                flight = self._session_flight = _Flight()
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = self._fetch_session()
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._session_lock:
+                if self._session_flight is flight:
+                    self._session_flight = None
+            flight.done.set()
+
+        return flight.result
+
+    def session(self, max_age=None):
+        return self.session_snapshot(max_age)[1]
 
     async def start_websocket(self, consumer):
         s = "%s/events" % self.websocket
@@ -51,5 +220,55 @@ class Client(object):
                 logging.debug("Websocket exception (%s)", wex)
 
     def run(self, command, verbose_errors=True):
-        r = requests.post("%s/session" % self.url, auth=self.auth, json={'cmd': command})
+        r = self._request('POST', "/session", json={'cmd': command})
+        # the command most likely changed the session state
+        self.invalidate_session()
         return decode(r, verbose_errors=verbose_errors)
+
+    def run_many(self, commands, verbose_errors=True):
+        """
+        Sends a sequence of commands to bettercap in a single request
+        """
+        return self.run(pipeline(commands), verbose_errors=verbose_errors)
+
+
+class AsyncClient(object):
+    """
+    The api of a Client as coroutines, for callers living on an event loop. The requests run on
+    a thread pool as big as the client's connection pool, so they share its keep-alive
+    connections and session snapshot and never block the loop.
+    """
+
+    def __init__(self, client, workers=None):
+        self.client = client
+        self._executor = ThreadPoolExecutor(max_workers=workers or client.pool_size)
+
+    async def _call(self, fn, *args, **kwargs):
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(fn, *args, **kwargs))
+
+    async def session_snapshot(self, max_age=None):
+        return await self._call(self.client.session_snapshot, max_age)
+
+    async def session(self, max_age=None):
+        return await self._call(self.client.session, max_age)
+
+    async def run(self, command, verbose_errors=True):
+        return await self._call(self.client.run, command, verbose_errors=verbose_errors)
+
+    async def run_many(self, commands, verbose_errors=True):
+        """
+        Sends a sequence of commands to bettercap in a single request
+        """
+        return await self._call(self.client.run_many, commands, verbose_errors=verbose_errors)
+
+    async def run_all(self, commands, verbose_errors=True):
+        """
+        Sends independent commands concurrently, one request each, and returns their results
+        in the same order, with the exception instead of the result for the ones that failed
+        """
+        return await asyncio.gather(*[self.run(command, verbose_errors=verbose_errors) for command in commands],
+                                    return_exceptions=True)
+
+    def close(self):
+        self._executor.shutdown(wait=False)
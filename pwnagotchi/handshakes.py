@@ -0,0 +1,118 @@
+import os
+import time
+import threading
+
+
+class HandshakeRegistry(object):
+    """
+    Handshakes captured during this session, keyed by "station -> ap" and
+    indexed by both macs so that lookups don't need to scan every key
+    """
+
+    def __init__(self, handshakes=None):
+        self._handshakes = {}
+        self._macs = set()
+        if handshakes:
+            self.load(handshakes)
+
+    @staticmethod
+    def key(sta_mac, ap_mac):
+        return "%s -> %s" % (sta_mac, ap_mac)
+
+    def add(self, sta_mac, ap_mac, event=None):
+        """
+        Returns True if the handshake wasn't in the registry already
+        """
+        key = HandshakeRegistry.key(sta_mac, ap_mac)
+        if key in self._handshakes:
+            return False
+
+        self._handshakes[key] = event
+        self._macs.add(sta_mac.lower())
+        self._macs.add(ap_mac.lower())
+        return True
+
+    def has(self, mac):
+        """
+        Returns True if we have a handshake for this mac, either as the access point or as the station
+        """
+        return mac.lower() in self._macs
+
+    def load(self, handshakes):
+        for key, event in handshakes.items():
+            self._handshakes[key] = event
+            for mac in key.split(' -> '):
+                self._macs.add(mac.strip().lower())
+
+    def to_dict(self):
+        return dict(self._handshakes)
+
+    def __contains__(self, key):
+        return key in self._handshakes
+
+    def __len__(self):
+        return len(self._handshakes)
+
+
+class HandshakeStore(object):
+    """
+    Keeps the number of unique pcap files inside the handshakes folder without
+    listing it every time: the folder is scanned once, then new captures are
+    added as bettercap reports them and the folder is only listed again when
+    its mtime changes (a file was created, removed or renamed) or, as a fallback,
+    every rescan_interval seconds.
+    """
+
+    def __init__(self, path, rescan_interval=60):
+        self.path = path
+        self.rescan_interval = rescan_interval
+        self._lock = threading.Lock()
+        self._files = set()
+        self._mtime = None
+        self._scanned_at = 0
+
+    @staticmethod
+    def _is_pcap(name):
+        # same as glob('*.pcap'), hidden files excluded
+        return name.endswith('.pcap') and not name.startswith('.')
+
+    def _scan(self, mtime, now):
+        try:
+            with os.scandir(self.path) as it:
+                self._files = set(e.name for e in it if HandshakeStore._is_pcap(e.name))
+        except OSError:
+            self._files = set()
+        self._mtime = mtime
+        self._scanned_at = now
+
+    def add(self, filename):
+        name = os.path.basename(filename)
+        if HandshakeStore._is_pcap(name):
+            with self._lock:
+                self._files.add(name)
+
+    def count(self):
+        now = time.time()
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except OSError:
+            mtime = None
+
+        with self._lock:
+            if mtime != self._mtime or (now - self._scanned_at) >= self.rescan_interval:
+                self._scan(mtime, now)
+            return len(self._files)
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def store_for(path):
+    """
+    Returns the HandshakeStore shared by everyone reading the given folder
+    """
+    with _stores_lock:
+        if path not in _stores:
+            _stores[path] = HandshakeStore(path)
+        return _stores[path]
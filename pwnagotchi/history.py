@@ -0,0 +1,91 @@
+import time
+
+from collections import OrderedDict
+
+
+class InteractionHistory(object):
+    """
+    Counts how many times we interacted with each mac, keeping at most max_entries
+    of them (least recently used ones are evicted first) and forgetting the ones
+    we didn't interact with for more than ttl seconds (0 to never forget).
+    """
+
+    def __init__(self, max_entries=10000, ttl=0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        # mac -> [counter, last interaction time], in least recently used order
+        self._entries = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    def _is_expired(self, entry, now):
+        return self.ttl > 0 and (now - entry[1]) > self.ttl
+
+    def _purge(self, now):
+        # entries are sorted by last access, so the expired ones are all at the front
+        while self._entries:
+            oldest = next(iter(self._entries.values()))
+            if not self._is_expired(oldest, now):
+                break
+            self._entries.popitem(last=False)
+            self._expirations += 1
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._evictions += 1
+
+    def hit(self, who):
+        """
+        Records an interaction with who and returns how many times we interacted with it
+        """
+        now = time.time()
+        entry = self._entries.get(who)
+        if entry is not None and self._is_expired(entry, now):
+            del self._entries[who]
+            self._expirations += 1
+            entry = None
+
+        if entry is None:
+            self._misses += 1
+            entry = self._entries[who] = [0, now]
+        else:
+            self._hits += 1
+            self._entries.move_to_end(who)
+
+        entry[0] += 1
+        entry[1] = now
+        self._purge(now)
+        return entry[0]
+
+    def get(self, who, default=0):
+        entry = self._entries.get(who)
+        if entry is None or self._is_expired(entry, time.time()):
+            return default
+        return entry[0]
+
+    def stats(self):
+        return {
+            'entries': len(self._entries),
+            'hits': self._hits,
+            'misses': self._misses,
+            'evictions': self._evictions,
+            'expirations': self._expirations
+        }
+
+    def load(self, history):
+        now = time.time()
+        for who, counter in history.items():
+            self._entries[who] = [counter, now]
+            self._entries.move_to_end(who)
+        self._purge(now)
+
+    def to_dict(self):
+        return {who: entry[0] for who, entry in self._entries.items()}
+
+    def __contains__(self, who):
+        return who in self._entries
+
+    def __len__(self):
+        return len(self._entries)
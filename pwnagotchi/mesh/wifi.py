@@ -11,3 +11,63 @@ def freq_to_channel(freq):
         return int(((freq - 5035) / 5) + 7)
     else:
         return 0
+
+
+class AccessPointTable(object):
+    """
+    Indexes a list of access points (as returned by bettercap) by bssid,
+    client station mac and channel, built once per session snapshot
+    """
+
+    def __init__(self, aps=()):
+        self.aps = list(aps)
+        self._by_bssid = {}
+        self._by_station = {}
+        self._by_channel = {}
+        self._stas_per_channel = {}
+        self.num_stations = 0
+
+        for ap in self.aps:
+            ch = ap['channel']
+            clients = ap['clients']
+            self._by_bssid[ap['mac'].lower()] = ap
+            if ch not in self._by_channel:
+                self._by_channel[ch] = [ap]
+                self._stas_per_channel[ch] = len(clients)
+            else:
+                self._by_channel[ch].append(ap)
+                self._stas_per_channel[ch] += len(clients)
+            self.num_stations += len(clients)
+
+            for sta in clients:
+                self._by_station[(ap['mac'].lower(), sta['mac'].lower())] = (ap, sta)
+
+    def __len__(self):
+        return len(self.aps)
+
+    def __iter__(self):
+        return iter(self.aps)
+
+    def ap(self, bssid):
+        return self._by_bssid.get(bssid.lower())
+
+    def station(self, ap_mac, sta_mac):
+        """
+        Returns the (ap, station) tuple or None if the station is not a client of that ap
+        """
+        return self._by_station.get((ap_mac.lower(), sta_mac.lower()))
+
+    def channels(self):
+        return list(self._by_channel.keys())
+
+    def on_channel(self, channel):
+        return self._by_channel.get(channel, [])
+
+    def by_channel(self):
+        return self._by_channel.items()
+
+    def aps_on_channel(self, channel):
+        return len(self._by_channel.get(channel, ()))
+
+    def stations_on_channel(self, channel):
+        return self._stas_per_channel.get(channel, 0)
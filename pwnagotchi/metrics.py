@@ -0,0 +1,132 @@
+import time
+import logging
+import threading
+
+from collections import deque
+
+PROC_STAT = '/proc/stat'
+PROC_MEMINFO = '/proc/meminfo'
+THERMAL_ZONE = '/sys/class/thermal/thermal_zone0/temp'
+CPU_FREQ = '/sys/devices/system/cpu/cpu0/cpufreq/scaling_cur_freq'
+
+sampler = None
+
+
+def _read_cpu_stat():
+    with open(PROC_STAT, 'rt') as fp:
+        return list(map(int, fp.readline().split()[1:]))
+
+
+def _cpu_load_between(parts0, parts1):
+    parts_diff = [p1 - p0 for (p0, p1) in zip(parts0, parts1)]
+    user, nice, sys, idle, iowait, irq, softirq, steal = parts_diff[:8]
+    idle_sum = idle + iowait
+    non_idle_sum = user + nice + sys + irq + softirq + steal
+    total = idle_sum + non_idle_sum
+    return non_idle_sum / total if total > 0 else 0.0
+
+
+def _read_mem_usage():
+    values = {}
+    with open(PROC_MEMINFO, 'rt') as fp:
+        for line in fp:
+            parts = line.split()
+            if parts[0] in ('MemTotal:', 'MemFree:', 'Buffers:', 'Cached:'):
+                values[parts[0]] = int(parts[1])
+                if len(values) == 4:
+                    break
+    used = values['MemTotal:'] - values['MemFree:'] - values['Cached:'] - values['Buffers:']
+    return round(used / values['MemTotal:'], 1)
+
+
+def _read_temperature():
+    with open(THERMAL_ZONE, 'rt') as fp:
+        return int(fp.read().strip()) / 1000.0
+
+
+def _read_cpu_freq():
+    # in MHz
+    with open(CPU_FREQ, 'rt') as fp:
+        return int(fp.read().strip()) / 1000.0
+
+
+class SystemMetrics(object):
+    """
+    Samples cpu load, memory usage, temperature and cpu frequency every interval
+    seconds in the background and keeps the last window samples of each, so that
+    readers never block on /proc or /sys.
+    """
+    METRICS = ('cpu', 'mem', 'temp', 'freq')
+
+    def __init__(self, interval=1.0, window=60):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._samples = {name: deque(maxlen=window) for name in SystemMetrics.METRICS}
+        self._prev_cpu = None
+        self._thread = None
+
+    def _sample(self, name, reader):
+        try:
+            value = reader()
+        except Exception as e:
+            # not every board has a thermal zone or cpufreq
+            logging.debug("can't sample %s: %s" % (name, e))
+            return
+
+        with self._lock:
+            self._samples[name].append(value)
+
+    def sample(self):
+        cpu = _read_cpu_stat()
+        if self._prev_cpu is not None:
+            prev = self._prev_cpu
+            self._sample('cpu', lambda: _cpu_load_between(prev, cpu))
+        self._prev_cpu = cpu
+
+        self._sample('mem', _read_mem_usage)
+        self._sample('temp', _read_temperature)
+        self._sample('freq', _read_cpu_freq)
+
+    def _worker(self):
+        while True:
+            try:
+                self.sample()
+            except Exception as e:
+                logging.debug("error while sampling system metrics: %s" % e)
+            time.sleep(self.interval)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._worker, daemon=True)
+            self._thread.start()
+        return self
+
+    def latest(self, name):
+        with self._lock:
+            samples = self._samples[name]
+            return samples[-1] if samples else None
+
+    def summary(self, name):
+        """
+        Returns min, avg and max of the metric over the sampling window
+        """
+        with self._lock:
+            samples = list(self._samples[name])
+
+        if not samples:
+            return {'min': None, 'avg': None, 'max': None}
+
+        return {
+            'min': min(samples),
+            'avg': sum(samples) / len(samples),
+            'max': max(samples),
+        }
+
+
+def start(config):
+    global sampler
+
+    conf = config['main']['metrics']
+    if conf['enabled'] and sampler is None:
+        sampler = SystemMetrics(interval=conf['interval'], window=conf['window']).start()
+    return sampler
@@ -1,16 +1,19 @@
 import os
 import glob
-import _thread
 import threading
+import time
 import importlib, importlib.util
 import logging
+from collections import deque
 
-
+from pwnagotchi.plugins.profiler import HookProfiler
 
 default_path = os.path.join(os.path.dirname(os.path.realpath(__file__)), "default")
 loaded = {}
 database = {}
 locks = {}
+# event name -> [(plugin name, lock name, bound callback)], rebuilt whenever plugins change
+callbacks = {}
 
 
 class Plugin:
@@ -30,6 +33,28 @@ class Plugin:
                 if cb is not None and callable(cb):
                     locks["%s::%s" % (plugin_name, attr_name)] = threading.Lock()
 
+        rebuild_callbacks()
+
+
+def rebuild_callbacks():
+    """
+    Maps every event to the loaded plugins implementing it, so that firing an event
+    doesn't need to look at the plugins that don't care about it
+    """
+    global loaded, callbacks
+
+    table = {}
+    for plugin_name, plugin in list(loaded.items()):
+        for attr_name in plugin.__dir__():
+            if attr_name.startswith('on_'):
+                cb = getattr(plugin, attr_name, None)
+                if cb is not None and callable(cb):
+                    lock_name = "%s::%s" % (plugin_name, attr_name)
+                    table.setdefault(attr_name[3:], []).append((plugin_name, lock_name, cb))
+
+    # swapped in one go, on() may be iterating the old one
+    callbacks = table
+
 
 def toggle_plugin(name, enable=True):
     """
@@ -53,6 +78,7 @@ def toggle_plugin(name, enable=True):
         if getattr(loaded[name], 'on_unload', None):
             loaded[name].on_unload(view.ROOT)
         del loaded[name]
+        rebuild_callbacks()
 
         return True
 
@@ -70,9 +96,144 @@ def toggle_plugin(name, enable=True):
     return False
 
 
+class Dispatcher(object):
+    """
+    Runs plugin callbacks on a pool of worker threads. Every callback has its own FIFO queue,
+    so calls to the same callback are still serialized and run in the order they were fired.
+    """
+
+    def __init__(self, workers=4, max_workers=16, max_queue=32,
+                 coalesce=('ui_update', 'wifi_update', 'unfiltered_ap_list'), idle_timeout=30.0):
+        self._lock = threading.Lock()
+        self._cond = threading.Condition(self._lock)
+        self._workers = workers
+        self._max_workers = max_workers
+        self._max_queue = max_queue
+        self._coalesce = set(coalesce)
+        self._idle_timeout = idle_timeout
+        # lock name -> pending calls
+        self._queues = {}
+        # lock names with pending calls and no worker on them, each one is here at most once
+        self._ready = deque()
+        self._scheduled = set()
+        self._threads = 0
+        self._idle = 0
+        self._stats = {}
+        self.profiler = HookProfiler()
+
+    def configure(self, workers, max_workers, max_queue, coalesce, slow_hook_ms=0):
+        with self._lock:
+            self._workers = workers
+            self._max_workers = max(workers, max_workers)
+            self._max_queue = max_queue
+            self._coalesce = set(coalesce)
+        self.profiler.configure(slow_hook_ms)
+
+    def _spawn(self):
+        self._threads += 1
+        threading.Thread(target=self._work, daemon=True).start()
+
+    def submit(self, lock_name, event_name, cb, args, kwargs):
+        """
+        Queues a call, returns False if it was dropped because the callback is too far behind
+        """
+        with self._lock:
+            pending = self._queues.setdefault(lock_name, deque())
+            stats = self._stats.setdefault(lock_name, {'queued': 0, 'done': 0, 'coalesced': 0, 'dropped': 0})
+
+            if event_name in self._coalesce and pending:
+                # only the most recent state is worth handling
+                stats['coalesced'] += len(pending)
+                pending.clear()
+            elif len(pending) >= self._max_queue:
+                stats['dropped'] += 1
+                logging.debug("dropping %s, %d calls are already queued" % (lock_name, len(pending)))
+                return False
+
+            pending.append((cb, args, kwargs, time.time()))
+            stats['queued'] += 1
+
+            if lock_name not in self._scheduled:
+                self._scheduled.add(lock_name)
+                self._ready.append(lock_name)
+                if len(self._ready) > self._idle and self._threads < self._max_workers:
+                    self._spawn()
+                else:
+                    self._cond.notify()
+
+        return True
+
+    def _work(self):
+        while True:
+            with self._lock:
+                while not self._ready:
+                    self._idle += 1
+                    notified = self._cond.wait(self._idle_timeout)
+                    self._idle -= 1
+                    if not notified and not self._ready and self._threads > self._workers:
+                        self._threads -= 1
+                        return
+
+                lock_name = self._ready.popleft()
+                pending = self._queues[lock_name]
+                cb, args, kwargs, queued_at = pending.popleft()
+
+            call = self.profiler.begin(lock_name, queued_at)
+            error = None
+            try:
+                self._run(call, cb, args, kwargs)
+            except Exception as e:
+                error = e
+                logging.error("error while running %s : %s" % (lock_name, e))
+                logging.error(e, exc_info=True)
+            finally:
+                self.profiler.end(call, error)
+
+            with self._lock:
+                self._stats[lock_name]['done'] += 1
+                if pending:
+                    # back of the line, so that a busy callback doesn't starve the others
+                    self._ready.append(lock_name)
+                else:
+                    self._scheduled.discard(lock_name)
+
+    def _run(self, call, cb, args, kwargs):
+        global locks
+
+        lock = locks.get(call.lock_name)
+        if lock is None:
+            lock = locks.setdefault(call.lock_name, threading.Lock())
+
+        contended = not lock.acquire(blocking=False)
+        if contended:
+            lock.acquire()
+        self.profiler.locked(call, contended)
+        try:
+            cb(*args, **kwargs)
+        finally:
+            lock.release()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'threads': self._threads,
+                'idle': self._idle,
+                'ready': len(self._ready),
+                'callbacks': {name: dict(stats, pending=len(self._queues[name]))
+                              for name, stats in self._stats.items()},
+            }
+
+
+dispatcher = Dispatcher()
+
+
 def on(event_name, *args, **kwargs):
-    for plugin_name in loaded.keys():
-        one(plugin_name, event_name, *args, **kwargs)
+    for plugin_name, lock_name, callback in callbacks.get(event_name, ()):
+        try:
+            dispatcher.submit(lock_name, event_name, callback, args, kwargs)
+        except Exception as e:
+            logging.error("error while running %s : %s" % (lock_name, e))
+            logging.error(e, exc_info=True)
 
 
 def locked_cb(lock_name, cb, *args, **kwargs):
@@ -82,7 +243,7 @@ def locked_cb(lock_name, cb, *args, **kwargs):
         locks[lock_name] = threading.Lock()
 
     with locks[lock_name]:
-        cb(*args, *kwargs)
+        cb(*args, **kwargs)
 
 
 def one(plugin_name, event_name, *args, **kwargs):
@@ -95,8 +256,7 @@ def one(plugin_name, event_name, *args, **kwargs):
         if callback is not None and callable(callback):
             try:
                 lock_name = "%s::%s" % (plugin_name, cb_name)
-                locked_cb_args = (lock_name, callback, *args, *kwargs)
-                _thread.start_new_thread(locked_cb, locked_cb_args)
+                dispatcher.submit(lock_name, event_name, callback, args, kwargs)
             except Exception as e:
                 logging.error("error while running %s.%s : %s" % (plugin_name, cb_name, e))
                 logging.error(e, exc_info=True)
@@ -128,6 +288,10 @@ def load_from_path(path, enabled=()):
 
 
 def load(config):
+    dispatch = config['main']['dispatch']
+    dispatcher.configure(dispatch['workers'], dispatch['max_workers'], dispatch['max_queue'], dispatch['coalesce'],
+                         dispatch['slow_hook_ms'])
+
     enabled = [name for name, options in config['main']['plugins'].items() if
                'enabled' in options and options['enabled']]
 
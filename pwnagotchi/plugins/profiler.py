@@ -0,0 +1,153 @@
+import bisect
+import logging
+import sys
+import threading
+import time
+import traceback
+
+# upper bounds of the histogram buckets in milliseconds, the last bucket takes everything slower
+BUCKETS = (1, 5, 10, 50, 100, 500, 1000, 5000)
+
+
+class Histogram(object):
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, ms):
+        self.counts[bisect.bisect_left(BUCKETS, ms)] += 1
+        self.total += ms
+        self.max = max(self.max, ms)
+
+    def to_dict(self):
+        num = sum(self.counts)
+        labels = ['<=%dms' % b for b in BUCKETS] + ['>%dms' % BUCKETS[-1]]
+        return {
+            'avg': self.total / num if num else 0.0,
+            'max': self.max,
+            'total': self.total,
+            'buckets': dict(zip(labels, self.counts)),
+        }
+
+
+class HookStats(object):
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.slow = 0
+        self.contended = 0
+        self.wait = Histogram()
+        self.lock = Histogram()
+        self.wall = Histogram()
+        self.cpu = Histogram()
+
+    def to_dict(self):
+        return {
+            'calls': self.calls,
+            'errors': self.errors,
+            'slow': self.slow,
+            'contended': self.contended,
+            'queue_wait': self.wait.to_dict(),
+            'lock_wait': self.lock.to_dict(),
+            'wall': self.wall.to_dict(),
+            'cpu': self.cpu.to_dict(),
+        }
+
+
+class Call(object):
+    def __init__(self, lock_name, queued_at):
+        self.lock_name = lock_name
+        self.queued_at = queued_at
+        self.started = time.time()
+        self.cpu_started = time.thread_time()
+        self.locked_at = None
+        self.contended = False
+        self.reported = False
+
+
+class HookProfiler(object):
+    """
+    Keeps per hook timings of the plugin callbacks and, if a threshold is set, logs
+    the stack of the hooks that are running for longer than that
+    """
+
+    def __init__(self, slow_ms=0):
+        self._lock = threading.Lock()
+        self._hooks = {}
+        # thread id -> Call being run by that thread
+        self._running = {}
+        self._slow_ms = 0
+        self._watchdog = None
+        self.configure(slow_ms)
+
+    def configure(self, slow_ms):
+        with self._lock:
+            self._slow_ms = slow_ms
+            if slow_ms > 0 and self._watchdog is None:
+                self._watchdog = threading.Thread(target=self._watch, daemon=True)
+                self._watchdog.start()
+
+    def begin(self, lock_name, queued_at):
+        call = Call(lock_name, queued_at)
+        with self._lock:
+            self._running[threading.get_ident()] = call
+        return call
+
+    def locked(self, call, contended):
+        call.locked_at = time.time()
+        call.contended = contended
+
+    def end(self, call, error=None):
+        now = time.time()
+        cpu = time.thread_time() - call.cpu_started
+        locked_at = call.locked_at or call.started
+        with self._lock:
+            self._running.pop(threading.get_ident(), None)
+            stats = self._hooks.get(call.lock_name)
+            if stats is None:
+                stats = self._hooks[call.lock_name] = HookStats()
+
+            stats.calls += 1
+            if error is not None:
+                stats.errors += 1
+            if call.contended:
+                stats.contended += 1
+            if call.reported:
+                stats.slow += 1
+            stats.wait.add((call.started - call.queued_at) * 1000.0)
+            stats.lock.add((locked_at - call.started) * 1000.0)
+            stats.wall.add((now - locked_at) * 1000.0)
+            stats.cpu.add(cpu * 1000.0)
+
+    def _watch(self):
+        while True:
+            with self._lock:
+                slow_ms = self._slow_ms
+            time.sleep(max(slow_ms, 100) / 2000.0)
+            if slow_ms <= 0:
+                continue
+
+            now = time.time()
+            frames = sys._current_frames()
+            slow = []
+            with self._lock:
+                for ident, call in self._running.items():
+                    if not call.reported and (now - call.started) * 1000.0 > slow_ms and ident in frames:
+                        call.reported = True
+                        slow.append((call, frames[ident]))
+
+            for call, frame in slow:
+                logging.warning("plugin hook %s is running for more than %dms:\n%s" % (
+                    call.lock_name, slow_ms, ''.join(traceback.format_stack(frame))))
+
+    def stats(self):
+        """
+        Returns {plugin: {hook: stats}}
+        """
+        with self._lock:
+            report = {}
+            for lock_name, stats in self._hooks.items():
+                plugin_name, hook = lock_name.split('::', 1)
+                report.setdefault(plugin_name, {})[hook] = stats.to_dict()
+            return report
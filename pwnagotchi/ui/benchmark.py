@@ -0,0 +1,128 @@
+import copy
+import logging
+import time
+
+import pwnagotchi.ui.fonts as fonts
+import pwnagotchi.ui.hw as hw
+from pwnagotchi.ui.view import View
+
+PANELS = (
+    'inky', 'papirus', 'oledhat', 'adafruitssd1306i2c', 'lcdhat', 'dfrobot_1', 'dfrobot_2',
+    'waveshare_1', 'waveshare_2', 'waveshare_3', 'waveshare27inch', 'waveshare29inch',
+    'waveshare144lcd', 'waveshare154inch', 'waveshare213d', 'waveshare213bc', 'waveshare213inb_v4',
+    'waveshare35lcd', 'spotpear24inch',
+)
+
+# what a busy session looks like to the ui, every step should end up in a new frame
+SCRIPT = (
+    lambda view, i: view.on_starting(),
+    lambda view, i: view.on_ai_ready(),
+    lambda view, i: view.update(new_data={'channel': '%02d' % (i % 14 + 1)}),
+    lambda view, i: view.on_normal(),
+    lambda view, i: view.update(new_data={'aps': '%d (%d)' % (i % 50, i % 200)}),
+    lambda view, i: view.on_free_channel(str(i % 14 + 1)),
+    lambda view, i: view.on_deauth({'mac': 'de:ad:be:ef:%02x:%02x' % (i % 256, (i * 7) % 256)}),
+    lambda view, i: view.update(new_data={'shakes': '%d (%d)' % (i, i * 3)}),
+    lambda view, i: view.on_bored(),
+    lambda view, i: view.on_miss('AP-%d' % i),
+    lambda view, i: view.on_handshakes(1),
+    lambda view, i: view.on_sad(),
+    lambda view, i: view.on_motivated(1.0),
+    lambda view, i: view.on_excited(),
+    lambda view, i: view.on_lonely(),
+    lambda view, i: view.on_demotivated(-1.0),
+)
+
+
+class Stage(object):
+    def __init__(self):
+        self.values = []
+
+    def add(self, secs):
+        self.values.append(secs * 1000.0)
+
+    def to_dict(self):
+        values = sorted(self.values)
+        if not values:
+            return {'avg': 0.0, 'p95': 0.0, 'max': 0.0}
+        return {
+            'avg': sum(values) / len(values),
+            'p95': values[min(len(values) - 1, int(len(values) * 0.95))],
+            'max': values[-1],
+        }
+
+
+def _bench(config, panel, frames):
+    config = copy.deepcopy(config)
+    config['ui']['fps'] = 0.0
+    config['ui']['display']['type'] = 'virtual'
+    config['ui']['display']['virtual']['panel'] = panel
+
+    impl = hw.display_for(config)
+    view = View(config, impl)
+    impl.initialize()
+
+    stages = {'draw': Stage(), 'pack': Stage(), 'transfer': Stage(), 'cpu': Stage()}
+    rendered = [None]
+
+    def on_render(canvas, rects):
+        rendered[0] = time.time()
+        impl.render_partial(canvas, rects)
+
+    view.on_render(on_render, with_rects=True)
+
+    done = step = idle = 0
+    started = time.time()
+    cpu_started = time.process_time()
+    while done < frames and idle < len(SCRIPT):
+        rendered[0] = None
+        step_started, step_cpu = time.time(), time.process_time()
+        SCRIPT[step % len(SCRIPT)](view, step)
+        step += 1
+        if rendered[0] is None:
+            # nothing changed, don't count it
+            idle += 1
+            continue
+        idle = 0
+
+        frame = impl.frames[-1]
+        stages['draw'].add(rendered[0] - step_started)
+        stages['pack'].add(frame.pack)
+        stages['transfer'].add(frame.transfer)
+        stages['cpu'].add(time.process_time() - step_cpu)
+        done += 1
+
+    elapsed = time.time() - started
+    return {
+        'panel': panel,
+        'size': '%dx%d' % (view.width(), view.height()),
+        'frames': done,
+        'fps': done / elapsed if elapsed else 0.0,
+        'cpu': (time.process_time() - cpu_started) * 1000.0 / done if done else 0.0,
+        'bytes': impl.sent / done if done else 0.0,
+        'stages': {name: stage.to_dict() for name, stage in stages.items()},
+    }
+
+
+def run(config, panels=None, frames=200):
+    """
+    Drives a View on a virtual display through SCRIPT, for each panel, and returns
+    the timings of every stage of the render path
+    """
+    fonts.init(config)
+    results = []
+    for panel in panels or PANELS:
+        logging.info("benchmarking %s ..." % panel)
+        results.append(_bench(config, panel, frames))
+    return results
+
+
+def report(results):
+    lines = ['%-20s %8s %8s %10s %10s %10s %10s %10s' % (
+        'panel', 'size', 'fps', 'draw ms', 'pack ms', 'xfer ms', 'cpu ms', 'bytes')]
+    for res in results:
+        lines.append('%-20s %8s %8.1f %10.2f %10.2f %10.2f %10.2f %10.0f' % (
+            res['panel'], res['size'], res['fps'],
+            res['stages']['draw']['avg'], res['stages']['pack']['avg'], res['stages']['transfer']['avg'],
+            res['cpu'], res['bytes']))
+    return '\n'.join(lines)
@@ -1,7 +1,92 @@
-from PIL import Image
+import threading
+
+from collections import OrderedDict
+from PIL import Image, ImageDraw
 from textwrap import TextWrapper
 
 
+def text_bbox(drawer, xy, text, font):
+    """
+    Returns the (left, top, right, bottom) box covered by the text drawn at xy
+    """
+    if hasattr(drawer, 'textbbox'):
+        return drawer.textbbox(xy, text, font=font)
+    # older Pillow versions
+    w, h = drawer.textsize(text, font=font)
+    return (xy[0], xy[1], xy[0] + w, xy[1] + h)
+
+
+class TextCache(object):
+    """
+    LRU cache of rasterized text, keyed by font, text and wrapping width, so that
+    widgets can paste a ready bitmap instead of going through FreeType every frame.
+    """
+
+    def __init__(self, max_bytes=256 * 1024):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._measure = ImageDraw.Draw(Image.new('1', (1, 1)))
+        self.hits = 0
+        self.misses = 0
+
+    def _rasterize(self, text, font):
+        x0, y0, x1, y1 = text_bbox(self._measure, (0, 0), text, font)
+        mask = Image.new('1', (max(x1 - x0, 1), max(y1 - y0, 1)), 0)
+        ImageDraw.Draw(mask).text((-x0, -y0), text, font=font, fill=1)
+        return (x0, y0), (x0, y0, x1, y1), mask
+
+    def get(self, text, font, wrapper=None):
+        """
+        Returns a ((dx, dy) offset, (left, top, right, bottom) box, mask) tuple for the text drawn at (0, 0)
+        """
+        key = (font, text, wrapper.width if wrapper is not None else 0)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            self.misses += 1
+
+        wrapped = '\n'.join(wrapper.wrap(text)) if wrapper is not None else text
+        entry = self._rasterize(wrapped, font)
+        size = entry[2].size[0] * entry[2].size[1] // 8 + 1
+
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = entry
+                self._bytes += size
+            while self._bytes > self.max_bytes and len(self._entries) > 1:
+                _, (_, _, old) = self._entries.popitem(last=False)
+                self._bytes -= old.size[0] * old.size[1] // 8 + 1
+        return entry
+
+    def bbox(self, xy, text, font, wrapper=None):
+        _, (x0, y0, x1, y1), _ = self.get(text, font, wrapper)
+        return (xy[0] + x0, xy[1] + y0, xy[0] + x1, xy[1] + y1)
+
+    def draw(self, canvas, xy, text, font, fill=0, wrapper=None):
+        (dx, dy), _, mask = self.get(text, font, wrapper)
+        canvas.paste(fill, (int(xy[0] + dx), int(xy[1] + dy)), mask)
+
+    def prerender(self, font, texts):
+        for text in texts:
+            self.get(text, font)
+
+
+text_cache = TextCache()
+
+
+def union(a, b):
+    return (min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3]))
+
+
+def intersects(a, b):
+    return a[0] <= b[2] and b[0] <= a[2] and a[1] <= b[3] and b[1] <= a[3]
+
+
 class Widget(object):
     def __init__(self, xy, color=0):
         self.xy = xy
@@ -10,6 +95,12 @@ class Widget(object):
     def draw(self, canvas, drawer):
         raise Exception("not implemented")
 
+    def bbox(self, drawer):
+        """
+        Returns the (left, top, right, bottom) box the widget draws into, or None if unknown
+        """
+        return None
+
 
 class Bitmap(Widget):
     def __init__(self, path, xy, color=0):
@@ -19,6 +110,10 @@ class Bitmap(Widget):
     def draw(self, canvas, drawer):
         canvas.paste(self.image, self.xy)
 
+    def bbox(self, drawer):
+        w, h = self.image.size
+        return (self.xy[0], self.xy[1], self.xy[0] + w, self.xy[1] + h)
+
 
 class Line(Widget):
     def __init__(self, xy, color=0, width=1):
@@ -28,16 +123,34 @@ class Line(Widget):
     def draw(self, canvas, drawer):
         drawer.line(self.xy, fill=self.color, width=self.width)
 
+    def bbox(self, drawer):
+        x0, y0, x1, y1 = _points_bbox(self.xy)
+        return (x0 - self.width, y0 - self.width, x1 + self.width, y1 + self.width)
+
+
+def _points_bbox(xy):
+    # both [x0, y0, x1, y1] and [(x0, y0), (x1, y1)] are valid for PIL
+    if isinstance(xy[0], (tuple, list)):
+        xy = [c for point in xy for c in point]
+    xs, ys = xy[0::2], xy[1::2]
+    return (min(xs), min(ys), max(xs), max(ys))
+
 
 class Rect(Widget):
     def draw(self, canvas, drawer):
         drawer.rectangle(self.xy, outline=self.color)
 
+    def bbox(self, drawer):
+        return _points_bbox(self.xy)
+
 
 class FilledRect(Widget):
     def draw(self, canvas, drawer):
         drawer.rectangle(self.xy, fill=self.color)
 
+    def bbox(self, drawer):
+        return _points_bbox(self.xy)
+
 
 class Text(Widget):
     def __init__(self, value="", position=(0, 0), font=None, color=0, wrap=False, max_length=0):
@@ -50,11 +163,12 @@ class Text(Widget):
 
     def draw(self, canvas, drawer):
         if self.value is not None:
-            if self.wrap:
-                text = '\n'.join(self.wrapper.wrap(self.value))
-            else:
-                text = self.value
-            drawer.text(self.xy, text, font=self.font, fill=self.color)
+            text_cache.draw(canvas, self.xy, self.value, self.font, fill=self.color, wrapper=self.wrapper)
+
+    def bbox(self, drawer):
+        if self.value is None:
+            return (self.xy[0], self.xy[1], self.xy[0], self.xy[1])
+        return text_cache.bbox(self.xy, self.value, self.font, wrapper=self.wrapper)
 
 
 class LabeledValue(Widget):
@@ -68,8 +182,16 @@ class LabeledValue(Widget):
 
     def draw(self, canvas, drawer):
         if self.label is None:
-            drawer.text(self.xy, self.value, font=self.label_font, fill=self.color)
+            text_cache.draw(canvas, self.xy, self.value, self.label_font, fill=self.color)
         else:
-            pos = self.xy
-            drawer.text(pos, self.label, font=self.label_font, fill=self.color)
-            drawer.text((pos[0] + self.label_spacing + 5 * len(self.label), pos[1]), self.value, font=self.text_font, fill=self.color)
+            text_cache.draw(canvas, self.xy, self.label, self.label_font, fill=self.color)
+            text_cache.draw(canvas, self._value_pos(), self.value, self.text_font, fill=self.color)
+
+    def _value_pos(self):
+        return (self.xy[0] + self.label_spacing + 5 * len(self.label), self.xy[1])
+
+    def bbox(self, drawer):
+        if self.label is None:
+            return text_cache.bbox(self.xy, self.value, self.label_font)
+        return union(text_cache.bbox(self.xy, self.label, self.label_font),
+                     text_cache.bbox(self._value_pos(), self.value, self.text_font))
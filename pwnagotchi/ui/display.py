@@ -1,9 +1,11 @@
 import os
 import logging
 import threading
+import time
 
 import pwnagotchi.plugins as plugins
 import pwnagotchi.ui.hw as hw
+import pwnagotchi.ui.web as web
 from pwnagotchi.ui.view import View
 
 
@@ -19,6 +21,25 @@ class Display(View):
 
         self._canvas_next_event = threading.Event()
         self._canvas_next = None
+        # regions changed since the last push to the display, None if it needs a full one
+        self._rects_next = None
+        self._rects_lock = threading.Lock()
+        # time the pending frame has been submitted at, None if there's none
+        self._submitted_at = None
+        self._min_refresh = config.get('min_refresh', self._implementation.min_refresh if self._implementation else 0.0)
+        self._full_refresh = config.get('full_refresh', self._implementation.full_refresh if self._implementation else 0.0)
+        self._render_stats = {
+            'submitted': 0,
+            'superseded': 0,
+            'skipped': 0,
+            'rendered': 0,
+            'full': 0,
+            'errors': 0,
+            'latency_tot': 0.0,
+            'latency_max': 0.0,
+            'render_tot': 0.0,
+            'render_max': 0.0,
+        }
         self._render_thread_instance = threading.Thread(
             target=self._render_thread,
             daemon=True
@@ -91,7 +112,7 @@ class Display(View):
             plugins.on('display_setup', self._implementation)
         else:
             logging.warning("display module is disabled")
-        self.on_render(self._on_view_rendered)
+        self.on_render(self._on_view_rendered, with_rects=True)
 
     def clear(self):
         self._implementation.clear()
@@ -102,17 +123,87 @@ class Display(View):
             img = self._canvas if self._rotation == 0 else self._canvas.rotate(-self._rotation)
         return img
 
+    def render_stats(self):
+        with self._rects_lock:
+            stats = dict(self._render_stats)
+        stats['min_refresh'] = self._min_refresh
+        stats['full_refresh'] = self._full_refresh
+        stats['latency_avg'] = stats['latency_tot'] / stats['rendered'] if stats['rendered'] else 0.0
+        stats['render_avg'] = stats['render_tot'] / stats['rendered'] if stats['rendered'] else 0.0
+        return stats
+
     def _render_thread(self):
         """Used for non-blocking screen updating."""
+        last_frame = None
+        last_at = 0.0
+        last_full_at = time.time()
 
         while True:
             self._canvas_next_event.wait()
-            self._canvas_next_event.clear()
-            self._implementation.render(self._canvas_next)
+            # frames submitted while we wait replace this one, only the newest is rendered
+            pause = last_at + self._min_refresh - time.time()
+            if pause > 0:
+                time.sleep(pause)
 
-    def _on_view_rendered(self, img):
+            self._canvas_next_event.clear()
+            with self._rects_lock:
+                canvas, rects, submitted_at = self._canvas_next, self._rects_next, self._submitted_at
+                self._rects_next = []
+                self._submitted_at = None
+            if canvas is None or submitted_at is None:
+                continue
+
+            started = time.time()
+            full = self._full_refresh > 0 and started - last_full_at >= self._full_refresh
+            frame = canvas.tobytes()
+            if frame == last_frame and not full:
+                with self._rects_lock:
+                    self._render_stats['skipped'] += 1
+                continue
+
+            try:
+                if full:
+                    self._implementation.render_full(canvas)
+                    last_full_at = started
+                elif rects is None:
+                    self._implementation.render(canvas)
+                else:
+                    self._implementation.render_partial(canvas, rects)
+                last_frame = frame
+            except Exception as e:
+                logging.exception("error while rendering on the display: %s" % e)
+                # we don't know what made it to the panel
+                last_frame = None
+                with self._rects_lock:
+                    self._render_stats['errors'] += 1
+                    self._rects_next = None
+                last_at = time.time()
+                continue
+
+            last_at = time.time()
+            with self._rects_lock:
+                stats = self._render_stats
+                stats['rendered'] += 1
+                stats['full'] += 1 if full else 0
+                stats['latency_tot'] += last_at - submitted_at
+                stats['latency_max'] = max(stats['latency_max'], last_at - submitted_at)
+                stats['render_tot'] += last_at - started
+                stats['render_max'] = max(stats['render_max'], last_at - started)
+
+    def _rotate_rects(self, img, rects):
+        if rects is None or self._rotation == 0:
+            return rects
+        elif self._rotation == 180:
+            w, h = img.size
+            return [(w - 1 - r, h - 1 - b, w - 1 - l, h - 1 - t) for l, t, r, b in rects]
+        # not worth the trouble, these are pushed whole
+        return None
+
+    def _on_view_rendered(self, img, rects=None):
         try:
             if self._config['ui']['web']['on_frame'] != '':
+                # frames are not written to disk anymore unless a hook needs them
+                web.save_frame()
                 os.system(self._config['ui']['web']['on_frame'])
         except Exception as e:
             logging.error("%s" % e)
@@ -120,5 +211,16 @@ class Display(View):
         if self._enabled:
             self._canvas = (img if self._rotation == 0 else img.rotate(self._rotation))
             if self._implementation is not None:
-                self._canvas_next = self._canvas
+                rects = self._rotate_rects(img, rects)
+                with self._rects_lock:
+                    self._render_stats['submitted'] += 1
+                    if self._submitted_at is None:
+                        self._submitted_at = time.time()
+                    else:
+                        self._render_stats['superseded'] += 1
+                    self._canvas_next = self._canvas
+                    if rects is None or self._rects_next is None:
+                        self._rects_next = None
+                    else:
+                        self._rects_next.extend(rects)
                 self._canvas_next_event.set()
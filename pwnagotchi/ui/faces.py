@@ -27,3 +27,7 @@ UPLOAD2 = '(0__1)'
 def load_from_config(config):
     for face_name, face_value in config.items():
         globals()[face_name.upper()] = face_value
+
+
+def all_faces():
+    return [value for name, value in globals().items() if name.isupper() and isinstance(value, str)]
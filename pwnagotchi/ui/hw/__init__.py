@@ -17,6 +17,7 @@ from pwnagotchi.ui.hw.waveshare213bc import Waveshare213bc
 from pwnagotchi.ui.hw.waveshare213inb_v4 import Waveshare213bV4
 from pwnagotchi.ui.hw.waveshare35lcd import Waveshare35lcd
 from pwnagotchi.ui.hw.spotpear24inch import Spotpear24inch
+from pwnagotchi.ui.hw.virtual import Virtual
 
 def display_for(config):
     # config has been normalized already in utils.load_config
@@ -76,3 +77,6 @@ def display_for(config):
 
     elif config['ui']['display']['type'] == 'spotpear24inch':
         return Spotpear24inch(config)
+
+    elif config['ui']['display']['type'] == 'virtual':
+        return Virtual(config)
@@ -5,6 +5,10 @@ class DisplayImpl(object):
     def __init__(self, config, name):
         self.name = name
         self.config = config['ui']['display']
+        # minimum seconds between two refreshes of the panel, and seconds between two full
+        # refreshes for the panels that ghost when partially refreshed for too long (0 is never)
+        self.min_refresh = 0.0
+        self.full_refresh = 0.0
         self._layout = {
             'width': 0,
             'height': 0,
@@ -36,5 +40,18 @@ class DisplayImpl(object):
     def render(self, canvas):
         raise NotImplementedError
 
+    def render_full(self, canvas):
+        """
+        Called every full_refresh seconds instead of render, to clean up the ghosting
+        """
+        self.render(canvas)
+
+    def render_partial(self, canvas, rects):
+        """
+        Called instead of render when only the (left, top, right, bottom) rects of the canvas
+        changed since the last frame, displays that can't send less than a whole frame just render it
+        """
+        self.render(canvas)
+
     def clear(self):
         raise NotImplementedError
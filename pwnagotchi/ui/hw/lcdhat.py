@@ -42,5 +42,8 @@ class LcdHat(DisplayImpl):
     def render(self, canvas):
         self._display.display(canvas)
 
+    def render_partial(self, canvas, rects):
+        self._display.display(canvas, rects)
+
     def clear(self):
         self._display.clear()
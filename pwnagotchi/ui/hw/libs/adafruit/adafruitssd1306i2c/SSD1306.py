@@ -32,6 +32,8 @@ import RPi.GPIO as GPIO
 import time
 from smbus import SMBus
 
+from pwnagotchi.ui.hw.libs import packing
+
 width = 128 #LCD width
 height = 64  #LCD height
 
@@ -78,7 +80,9 @@ class SSD1306Base(object):
         self.width = width
         self.height = height
         self._pages = height//8
-        self._buffer = [0]*(width*self._pages)
+        self._buffer = bytearray(width*self._pages)
+        # what the display is showing, None until the first frame is sent
+        self._sent = None
         if i2c_bus is None:
             self._i2c = SMBus(1)
         else:
@@ -117,7 +121,8 @@ class SSD1306Base(object):
         """Initialize display."""
         # Save vcc state.
         self._vccstate = vccstate
-        # Reset and initialize display.
+        # Reset and initialize display, we don't know what it shows anymore.
+        self._sent = None
         self.reset()
         self._initialize()
         # Turn on the display.
@@ -141,20 +146,23 @@ class SSD1306Base(object):
         self._i2c.write_i2c_block_data(SSD1306_I2C_ADDRESS, register, data)
 
     def display(self):
-        """Write display buffer to physical display."""
+        """Write display buffer to physical display, only the pages that changed are sent."""
+        dirty = packing.dirty_pages(self._sent, self._buffer, self.width)
+        if dirty is None:
+            return
+        first, last = dirty
         self.command(SSD1306_COLUMNADDR)
         self.command(0)              # Column start address. (0 = reset)
         self.command(self.width-1)   # Column end address.
         self.command(SSD1306_PAGEADDR)
-        self.command(0)              # Page start address. (0 = reset)
-        self.command(self._pages-1)  # Page end address.
-        # Write buffer data.
-        for i in range(0, len(self._buffer), 16):
+        self.command(first)          # Page start address.
+        self.command(last)           # Page end address.
+        # Write buffer data, 32 bytes is as much as a single smbus block write can take.
+        data = self._buffer[first*self.width:(last+1)*self.width]
+        for i in range(0, len(data), 32):
             control = 0x40   # Co = 0, DC = 0
-            # data = bytearray(len(self._buffer[i:i+16]) + 1)
-            # data[0] = control & 0xFF
-            # data[1:] = self._buffer[i:i+16]
-            self.writeList(control, self._buffer[i:i+16])
+            self.writeList(control, list(data[i:i+32]))
+        self._sent = bytes(self._buffer)
 
     def image(self, image):
         """Set buffer to value of Python Imaging Library image.  The image should
@@ -166,26 +174,11 @@ class SSD1306Base(object):
         if imwidth != self.width or imheight != self.height:
             raise ValueError('Image must be same dimensions as display ({0}x{1}).' \
                 .format(self.width, self.height))
-        # Grab all the pixels from the image, faster than getpixel.
-        pix = image.load()
-        # Iterate through the memory pages
-        index = 0
-        for page in range(self._pages):
-            # Iterate through all x axis columns.
-            for x in range(self.width):
-                # Set the bits for the column of pixels at the current position.
-                bits = 0
-                # Don't use range here as it's a bit slow
-                for bit in [0, 1, 2, 3, 4, 5, 6, 7]:
-                    bits = bits << 1
-                    bits |= 0 if pix[(x, page*8+7-bit)] == 0 else 1
-                # Update buffer byte and increment to next byte.
-                self._buffer[index] = bits
-                index += 1
+        self._buffer = packing.pack_pages(image, self.width, self.height)
 
     def clear(self):
         """Clear contents of image buffer."""
-        self._buffer = [0]*(self.width*self._pages)
+        self._buffer = bytearray(self.width*self._pages)
 
     def set_contrast(self, contrast):
         """Sets the contrast of the display.  Contrast should be a value between
@@ -0,0 +1,106 @@
+import os
+import struct
+from fcntl import ioctl
+from mmap import mmap
+
+import numpy as np
+from PIL import Image
+
+from pwnagotchi.ui.hw.libs.fb.fb import FBIOGET_VSCREENINFO, FBIOGET_FSCREENINFO
+
+_VSCREENINFO = 'I' * 40
+_FSCREENINFO = 'c' * 16 + 'L' + 'I' * 4 + 'H' * 3 + 'ILIIHHH'
+
+
+def screen_info(fd):
+    """
+    Returns (width, height, bpp, line length, rgb) of the framebuffer device, rgb is True
+    when red is in the low bits of a pixel
+    """
+    vi = struct.unpack(_VSCREENINFO, ioctl(fd, FBIOGET_VSCREENINFO, bytes(struct.calcsize(_VSCREENINFO))))
+    fi = struct.unpack(_FSCREENINFO, ioctl(fd, FBIOGET_FSCREENINFO, bytes(struct.calcsize(_FSCREENINFO))))
+    return vi[0], vi[1], vi[6], fi[24], vi[8] == 0
+
+
+class Framebuffer(object):
+    """
+    Keeps the framebuffer mapped in memory and writes PIL images to it, converted to its
+    pixel format with numpy and only for the rows that changed since the last one.
+
+    The geometry is read from the device unless it's given, so that a regular file can
+    stand in for /dev/fbN.
+    """
+
+    def __init__(self, path='/dev/fb0', width=None, height=None, bpp=None, line_length=None, rgb=False):
+        self.path = path
+        self._file = open(path, 'r+b')
+        if width is None:
+            width, height, bpp, line_length, rgb = screen_info(self._file)
+
+        self.width = width
+        self.height = height
+        self.bpp = bpp
+        self.rgb = rgb
+        self.bytepp = bpp // 8
+        self.line_length = line_length or width * self.bytepp
+
+        size = self.line_length * height
+        if os.path.isfile(path) and os.fstat(self._file.fileno()).st_size < size:
+            self._file.truncate(size)
+
+        self._mm = mmap(self._file.fileno(), size)
+        # the mapped memory as rows of bytes, without the padding at the end of each line
+        self._rows = np.frombuffer(self._mm, dtype=np.uint8).reshape(height, self.line_length)[:, :width * self.bytepp]
+        self._last = None
+
+    def convert(self, img):
+        """
+        Returns the image as a (height, width * bytes per pixel) array in the framebuffer format
+        """
+        rgb = np.asarray(img.convert('RGB'))
+        if not self.rgb:
+            rgb = rgb[..., ::-1]
+
+        if self.bpp == 16:
+            rgb = rgb.astype(np.uint16)
+            pixels = (rgb[..., 2] >> 3 << 11) | (rgb[..., 1] >> 2 << 5) | (rgb[..., 0] >> 3)
+            data = pixels.astype('<u2').view(np.uint8)
+        elif self.bpp == 24:
+            data = rgb
+        elif self.bpp == 32:
+            data = np.dstack((rgb, np.full(rgb.shape[:2], 0xFF, dtype=np.uint8)))
+        else:
+            raise ValueError("unsupported framebuffer depth: %d bpp" % self.bpp)
+
+        return np.ascontiguousarray(data).reshape(rgb.shape[0], -1)
+
+    def show(self, img):
+        """
+        Writes the image to the top left corner of the framebuffer and returns how many rows
+        have been written
+        """
+        data = self.convert(img)
+        height, width = min(data.shape[0], self.height), min(data.shape[1], self._rows.shape[1])
+        data = data[:height, :width]
+
+        if self._last is not None and self._last.shape == data.shape:
+            dirty = np.flatnonzero((data != self._last).any(axis=1))
+            if not len(dirty):
+                return 0
+            top, bottom = dirty[0], dirty[-1] + 1
+        else:
+            top, bottom = 0, height
+
+        self._rows[top:bottom, :width] = data[top:bottom]
+        self._last = data
+        return bottom - top
+
+    def fill(self, r, g, b):
+        self._rows[:] = np.tile(self.convert(Image.new('RGB', (1, 1), (r, g, b))), (1, self.width))
+        self._last = None
+
+    def close(self):
+        self._rows = None
+        self._last = None
+        self._mm.close()
+        self._file.close()
@@ -0,0 +1,160 @@
+"""
+Converts 1-bit canvases to the byte layouts expected by the e-paper panels and the
+monochrome OLEDs, using PIL's own packing instead of setting every bit from a python loop.
+"""
+import math
+
+from PIL import Image
+
+_INVERT = bytes(range(255, -1, -1))
+
+
+def row_bytes(width):
+    return (width + 7) // 8
+
+
+def blank(width, height):
+    return bytearray([0xFF]) * (row_bytes(width) * height)
+
+
+def invert(buf):
+    """
+    Flips every bit of the buffer, for the panels that want the previous frame inverted.
+    """
+    return bytes(buf).translate(_INVERT)
+
+
+def _tobytes(img, width):
+    # rows are padded to whole bytes, the padding is white like the rest of the buffer
+    stride = row_bytes(width) * 8
+    if img.width != stride:
+        padded = Image.new('1', (stride, img.height), 1)
+        padded.paste(img, (0, 0))
+        img = padded
+    return bytearray(img.tobytes('raw', '1'))
+
+
+def pack(image, width, height):
+    """
+    Rows of width pixels, most significant bit first, a cleared bit is a black pixel.
+    A height x width image is rotated by 90 degrees counter clockwise to fit.
+    """
+    img = image.convert('1')
+    if img.size == (width, height):
+        pass
+    elif img.size == (height, width):
+        img = img.transpose(Image.ROTATE_90)
+    else:
+        return blank(width, height)
+
+    return _tobytes(img, width)
+
+
+def pack_mirrored(image, width, height):
+    """
+    Same as pack, but rows are mirrored and start one bit in, as the 2.13 v2 and the
+    dfrobot panels expect them. A height x width image is transposed to fit.
+    """
+    img = image.convert('1')
+    if img.size == (width, height):
+        stride = row_bytes(width) * 8
+        mirrored = Image.new('1', (stride, height), 1)
+        mirrored.paste(img.transpose(Image.FLIP_LEFT_RIGHT), (1, 0))
+        return bytearray(mirrored.tobytes('raw', '1'))
+    elif img.size == (height, width):
+        return _tobytes(img.transpose(Image.TRANSPOSE), width)
+
+    return blank(width, height)
+
+
+def pack_pages(image, width, height):
+    """
+    Pages of 8 rows, each one a byte per column with the top row in the least significant
+    bit, a set bit is a lit pixel. This is how the SSD1306 and SH1106 OLEDs take them.
+    A height x width image is rotated by 90 degrees counter clockwise to fit.
+    """
+    img = image.convert('1')
+    if img.size == (height, width):
+        img = img.transpose(Image.ROTATE_90)
+    elif img.size != (width, height):
+        return bytearray([0xFF]) * (row_bytes(height) * width)
+
+    # the columns, packed least significant bit first, are the bytes we need in the wrong order
+    pages = row_bytes(height)
+    data = img.transpose(Image.TRANSPOSE).tobytes('raw', '1;R')
+    return bytearray(b''.join(data[page::pages] for page in range(pages)))
+
+
+def dirty_pages(old, new, width):
+    """
+    Returns the (first, last) pages that differ between two pack_pages buffers, or None
+    if they're the same. old can be None, when nothing's been sent yet.
+    """
+    pages = len(new) // width
+    if old is None or len(old) != len(new):
+        return 0, pages - 1
+
+    dirty = [page for page in range(pages) if old[page * width:(page + 1) * width] != new[page * width:(page + 1) * width]]
+    return (dirty[0], dirty[-1]) if dirty else None
+
+
+def _window(rect, size, width, height, mirrored):
+    left, top = int(rect[0]), int(rect[1])
+    right, bottom = int(math.ceil(rect[2])), int(math.ceil(rect[3]))
+
+    if size == (width, height):
+        bits = (width - right, width - left) if mirrored else (left, right)
+        rows = (top, bottom)
+    elif mirrored:
+        bits, rows = (top, bottom), (left, right)
+    else:
+        bits, rows = (top, bottom), (size[0] - 1 - right, size[0] - 1 - left)
+
+    x0, x1 = max(bits[0], 0) // 8, min(bits[1], row_bytes(width) * 8 - 1) // 8
+    y0, y1 = max(rows[0], 0), min(rows[1], height - 1)
+    if x0 > x1 or y0 > y1:
+        return None
+    return x0, y0, x1, y1
+
+
+def windows(rects, size, width, height, mirrored=False, max_ratio=0.5):
+    """
+    Maps the (left, top, right, bottom) rects of a canvas of the given size to the
+    (first byte, first row, last byte, last row) windows of the buffer that pack (or
+    pack_mirrored) would build from it, merging the ones that touch. Returns None when
+    it's cheaper to send the whole buffer.
+    """
+    if size not in ((width, height), (height, width)):
+        return None
+
+    found = []
+    for rect in rects:
+        win = _window(rect, size, width, height, mirrored)
+        if win is None:
+            continue
+
+        merged = True
+        while merged:
+            merged = False
+            for other in found:
+                if win[0] <= other[2] + 1 and other[0] <= win[2] + 1 and \
+                        win[1] <= other[3] + 1 and other[1] <= win[3] + 1:
+                    found.remove(other)
+                    win = (min(win[0], other[0]), min(win[1], other[1]), max(win[2], other[2]), max(win[3], other[3]))
+                    merged = True
+                    break
+        found.append(win)
+
+    total = sum((x1 - x0 + 1) * (y1 - y0 + 1) for x0, y0, x1, y1 in found)
+    if total > max_ratio * row_bytes(width) * height:
+        return None
+    return found
+
+
+def crop(buf, width, window):
+    """
+    Returns the bytes of a (first byte, first row, last byte, last row) window of the buffer.
+    """
+    x0, y0, x1, y1 = window
+    stride = row_bytes(width)
+    return b''.join(bytes(buf[y * stride + x0:y * stride + x1 + 1]) for y in range(y0, y1 + 1))
@@ -0,0 +1,54 @@
+"""
+Converts canvases to the big endian RGB565 pixels expected by the ST7789/ST7735 LCDs,
+keeping them in a numpy array that can be handed to spidev as it is.
+"""
+import math
+
+import numpy as np
+
+
+def convert(image, out=None):
+    """
+    Returns the pixels of the image as a (height, width, 2) array, written into out
+    if it has the right shape so that the same buffer is reused for every frame.
+    """
+    rgb = np.asarray(image.convert('RGB'))
+    r, g, b = rgb[..., 0], rgb[..., 1], rgb[..., 2]
+    if out is None or out.shape != rgb.shape[:2] + (2,):
+        out = np.empty(rgb.shape[:2] + (2,), dtype=np.uint8)
+
+    hi, lo = out[..., 0], out[..., 1]
+    np.bitwise_and(r, 0xF8, out=hi)
+    hi |= g >> 5
+    np.left_shift(g, 3, out=lo)
+    lo &= 0xE0
+    lo |= b >> 3
+    return out
+
+
+def windows(rects, width, height, max_ratio=0.5):
+    """
+    Clips the (left, top, right, bottom) rects to the screen, returns None when
+    they cover so much of it that sending the whole frame is cheaper.
+    """
+    if rects is None:
+        return None
+
+    found = []
+    for rect in rects:
+        x0, y0 = max(int(rect[0]), 0), max(int(rect[1]), 0)
+        x1, y1 = min(int(math.ceil(rect[2])), width - 1), min(int(math.ceil(rect[3])), height - 1)
+        if x0 <= x1 and y0 <= y1:
+            found.append((x0, y0, x1, y1))
+
+    if sum((x1 - x0 + 1) * (y1 - y0 + 1) for x0, y0, x1, y1 in found) > max_ratio * width * height:
+        return None
+    return found
+
+
+def crop(pix, window):
+    """
+    Returns the pixels of a (first column, first row, last column, last row) window.
+    """
+    x0, y0, x1, y1 = window
+    return np.ascontiguousarray(pix[y0:y1 + 1, x0:x1 + 1])
@@ -1,7 +1,8 @@
 import spidev
 import RPi.GPIO as GPIO
 import time
-import numpy as np
+
+from pwnagotchi.ui.hw.libs import rgb565
 
 
 class ST7789(object):
@@ -23,6 +24,8 @@ class ST7789(object):
         # Initialize SPI
         self._spi = spi
         self._spi.max_speed_hz = 40000000
+        # reused by every frame instead of allocating a new one
+        self._pix = None
 
     """    Write register address and data     """
 
@@ -34,6 +37,11 @@ class ST7789(object):
         GPIO.output(self._dc, GPIO.HIGH)
         self._spi.writebytes([val])
 
+    # writebytes2 splits the buffer in transfers the driver can handle
+    def data2(self, buf):
+        GPIO.output(self._dc, GPIO.HIGH)
+        self._spi.writebytes2(buf)
+
     def Init(self):
         """Initialize display"""
         self.reset()
@@ -140,27 +148,26 @@ class ST7789(object):
 
         self.command(0x2C)
 
-    def ShowImage(self, Image, Xstart, Ystart):
+    def ShowImage(self, Image, Xstart, Ystart, rects=None):
         """Set buffer to value of Python Imaging Library image."""
-        """Write display buffer to physical display"""
+        """Write display buffer to physical display, or only the (left, top, right, bottom) rects of it"""
         imwidth, imheight = Image.size
         if imwidth != self.width or imheight != self.height:
             raise ValueError('Image must be same dimensions as display \
                 ({0}x{1}).'.format(self.width, self.height))
-        img = np.asarray(Image)
-        pix = np.zeros((self.width, self.height, 2), dtype=np.uint8)
-        pix[..., [0]] = np.add(np.bitwise_and(img[..., [0]], 0xF8), np.right_shift(img[..., [1]], 5))
-        pix[..., [1]] = np.add(np.bitwise_and(np.left_shift(img[..., [1]], 3), 0xE0), np.right_shift(img[..., [2]], 3))
-        pix = pix.flatten().tolist()
-        self.SetWindows(0, 0, self.width, self.height)
-        GPIO.output(self._dc, GPIO.HIGH)
-        for i in range(0, len(pix), 4096):
-            self._spi.writebytes(pix[i:i + 4096])
+        self._pix = rgb565.convert(Image, self._pix)
+
+        windows = rgb565.windows(rects, self.width, self.height)
+        if windows is None:
+            self.SetWindows(0, 0, self.width, self.height)
+            self.data2(self._pix.reshape(-1))
+        else:
+            for x0, y0, x1, y1 in windows:
+                self.SetWindows(x0, y0, x1 + 1, y1 + 1)
+                self.data2(rgb565.crop(self._pix, (x0, y0, x1, y1)).reshape(-1))
 
     def clear(self):
         """Clear contents of image buffer"""
-        _buffer = [0xff] * (self.width * self.height * 2)
+        _buffer = bytes([0xff]) * (self.width * self.height * 2)
         self.SetWindows(0, 0, self.width, self.height)
-        GPIO.output(self._dc, GPIO.HIGH)
-        for i in range(0, len(_buffer), 4096):
-            self._spi.writebytes(_buffer[i:i + 4096])
+        self.data2(_buffer)
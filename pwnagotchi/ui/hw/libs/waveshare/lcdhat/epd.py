@@ -16,6 +16,6 @@ class EPD(object):
     def clear(self):
         self.st7789.clear()
 
-    def display(self, image):
+    def display(self, image, rects=None):
         rgb_im = image.convert('RGB')
-        self.st7789.ShowImage(rgb_im, 0, 0)
+        self.st7789.ShowImage(rgb_im, 0, 0, rects)
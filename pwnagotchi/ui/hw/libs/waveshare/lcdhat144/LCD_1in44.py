@@ -28,8 +28,8 @@
 
 import RPi.GPIO as GPIO
 import time
-import numpy as np
 from . import config
+from pwnagotchi.ui.hw.libs import rgb565
 
 LCD_1IN44 = 1
 LCD_1IN8 = 0
@@ -67,6 +67,8 @@ class LCD:
 		self.LCD_Scan_Dir = SCAN_DIR_DFT
 		self.LCD_X_Adjust = LCD_X
 		self.LCD_Y_Adjust = LCD_Y
+		# reused by every frame instead of allocating a new one
+		self._pix = None
 
 	"""    Hardware reset     """
 	def  LCD_Reset(self):
@@ -88,6 +90,10 @@ class LCD:
 		GPIO.output(config.LCD_DC_PIN, GPIO.HIGH)
 		config.SPI_Write_Byte([Data])
 
+	def LCD_WriteData_Buffer(self, Data):
+		GPIO.output(config.LCD_DC_PIN, GPIO.HIGH)
+		config.SPI_Write_Buffer(Data)
+
 	def LCD_WriteData_NLen16Bit(self, Data, DataLen):
 		GPIO.output(config.LCD_DC_PIN, GPIO.HIGH)
 		for i in range(0, DataLen):
@@ -295,25 +301,24 @@ class LCD:
 
 	def LCD_Clear(self):
 		#hello
-		_buffer = [0xff]*(self.width * self.height * 2)
+		_buffer = bytes([0xff])*(self.width * self.height * 2)
 		self.LCD_SetWindows(0, 0, self.width, self.height)
-		GPIO.output(config.LCD_DC_PIN, GPIO.HIGH)
-		for i in range(0,len(_buffer),4096):
-			config.SPI_Write_Byte(_buffer[i:i+4096])
+		self.LCD_WriteData_Buffer(_buffer)
 
-	def LCD_ShowImage(self,Image,Xstart,Ystart):
+	def LCD_ShowImage(self,Image,Xstart,Ystart,rects=None):
 		if (Image == None):
 			return
 		imwidth, imheight = Image.size
 		if imwidth != self.width or imheight != self.height:
 			raise ValueError('Image must be same dimensions as display \
 				({0}x{1}).' .format(self.width, self.height))
-		img = np.asarray(Image)
-		pix = np.zeros((self.width,self.height,2), dtype = np.uint8)
-		pix[...,[0]] = np.add(np.bitwise_and(img[...,[0]],0xF8),np.right_shift(img[...,[1]],5))
-		pix[...,[1]] = np.add(np.bitwise_and(np.left_shift(img[...,[1]],3),0xE0),np.right_shift(img[...,[2]],3))
-		pix = pix.flatten().tolist()
-		self.LCD_SetWindows(0, 0, self.width , self.height)
-		GPIO.output(config.LCD_DC_PIN, GPIO.HIGH)
-		for i in range(0,len(pix),4096):
-			config.SPI_Write_Byte(pix[i:i+4096])
+		self._pix = rgb565.convert(Image, self._pix)
+
+		windows = rgb565.windows(rects, self.width, self.height)
+		if windows is None:
+			self.LCD_SetWindows(0, 0, self.width , self.height)
+			self.LCD_WriteData_Buffer(self._pix.reshape(-1))
+		else:
+			for x0, y0, x1, y1 in windows:
+				self.LCD_SetWindows(x0, y0, x1 + 1, y1 + 1)
+				self.LCD_WriteData_Buffer(rgb565.crop(self._pix, (x0, y0, x1, y1)).reshape(-1))
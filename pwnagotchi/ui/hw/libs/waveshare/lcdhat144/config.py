@@ -60,6 +60,10 @@ def Driver_Delay_ms(xms):
 def SPI_Write_Byte(data):
     SPI.writebytes(data)
 
+# writebytes2 splits the buffer in transfers the driver can handle
+def SPI_Write_Buffer(data):
+    SPI.writebytes2(data)
+
 def GPIO_Init():
     GPIO.setmode(GPIO.BCM)
     GPIO.setwarnings(False)
@@ -27,6 +27,6 @@ class EPD(object):
         #self.LCD.LCD_Clear()
         pass
 
-    def display(self, image):
+    def display(self, image, rects=None):
         rgb_im = ImageOps.colorize(image.convert("L"), black ="green", white ="black")
-        self.LCD.LCD_ShowImage(rgb_im, 0, 0)
+        self.LCD.LCD_ShowImage(rgb_im, 0, 0, rects)
@@ -2,6 +2,8 @@ from . import config
 import RPi.GPIO as GPIO
 import time
 
+from pwnagotchi.ui.hw.libs import packing
+
 Device_SPI = config.Device_SPI
 Device_I2C = config.Device_I2C
 
@@ -17,6 +19,8 @@ class SH1106(object):
         self._rst = config.RST_PIN
         self._bl = config.BL_PIN
         self.Device = config.Device
+        # what the display is showing, None until the first frame is sent
+        self._shown = None
 
 
     """    Write register address and data     """
@@ -35,6 +39,7 @@ class SH1106(object):
         if (config.module_init() != 0):
             return -1
         """Initialize display"""
+        self._shown = None
         self.reset()
         self.command(0xAE);#--turn off oled panel
         self.command(0x02);#---set low column address
@@ -74,30 +79,7 @@ class SH1106(object):
         time.sleep(0.1)
 
     def getbuffer(self, image):
-        # print "bufsiz = ",(self.width/8) * self.height
-        buf = [0xFF] * ((self.width//8) * self.height)
-        image_monocolor = image.convert('1')
-        imwidth, imheight = image_monocolor.size
-        pixels = image_monocolor.load()
-        # print "imwidth = %d, imheight = %d",imwidth,imheight
-        if(imwidth == self.width and imheight == self.height):
-            #print ("Vertical")
-            for y in range(imheight):
-                for x in range(imwidth):
-                    # Set the bits for the column of pixels at the current position.
-                    if pixels[x, y] == 0:
-                        buf[x + (y // 8) * self.width] &= ~(1 << (y % 8))
-                        # print x,y,x + (y * self.width)/8,buf[(x + y * self.width) / 8]
-
-        elif(imwidth == self.height and imheight == self.width):
-            #print ("Vertical")
-            for y in range(imheight):
-                for x in range(imwidth):
-                    newx = y
-                    newy = self.height - x - 1
-                    if pixels[x, y] == 0:
-                        buf[(newx + (newy // 8 )*self.width) ] &= ~(1 << (y % 8))
-        return buf
+        return packing.pack_pages(image, self.width, self.height)
 
 
     # def ShowImage(self,Image):
@@ -107,7 +89,14 @@ class SH1106(object):
             # config.spi_writebyte([~Image[i]])
 
     def ShowImage(self, pBuf):
+        pBuf = bytes(pBuf)
+        # the panel lights the cleared bits
+        data = packing.invert(pBuf)
         for page in range(0,8):
+            # pages are addressed one by one, the ones that didn't change are skipped
+            start, end = self.width * page, self.width * (page + 1)
+            if self._shown is not None and self._shown[start:end] == pBuf[start:end]:
+                continue
             # set page address #
             self.command(0xB0 + page);
             # set low column address #
@@ -118,18 +107,13 @@ class SH1106(object):
             time.sleep(0.01)
             if(self.Device == Device_SPI):
                 GPIO.output(self._dc, GPIO.HIGH);
-            for i in range(0,self.width):#for(int i=0;i<self.width; i++)
-                if(self.Device == Device_SPI):
-                    config.spi_writebyte([~pBuf[i + self.width * page]]);
-                else :
-                    config.i2c_writebyte(0x40, ~pBuf[i + self.width * page])
-
-
-
-
+                config.spi_writebyte2(data[start:end])
+            else :
+                config.i2c_writeblock(0x40, data[start:end])
+        self._shown = pBuf
 
     def clear(self):
         """Clear contents of image buffer"""
-        _buffer = [0xff]*(self.width * self.height//8)
+        _buffer = bytes([0xff])*(self.width * self.height//8)
         self.ShowImage(_buffer)
             #print "%d",_buffer[i:i+4096]
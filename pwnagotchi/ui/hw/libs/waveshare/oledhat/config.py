@@ -68,9 +68,18 @@ def spi_writebyte(data):
     # SPI.writebytes(data)
     spi.writebytes([data[0]])
 
+# writebytes2 splits the buffer in transfers the driver can handle
+def spi_writebyte2(data):
+    spi.writebytes2(data)
+
 def i2c_writebyte(reg, value):
     bus.write_byte_data(address, reg, value)
 
+# 32 bytes is as much as a single smbus block write can take
+def i2c_writeblock(reg, data):
+    for i in range(0, len(data), 32):
+        bus.write_i2c_block_data(address, reg, list(data[i:i + 32]))
+
     # time.sleep(0.01)
 def module_init():
     # print("module_init")
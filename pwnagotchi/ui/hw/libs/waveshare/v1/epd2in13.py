@@ -30,6 +30,7 @@
 
 import logging
 from . import epdconfig
+from pwnagotchi.ui.hw.libs import packing
 
 # Display resolution
 EPD_WIDTH       = 122
@@ -81,6 +82,13 @@ class EPD:
         epdconfig.spi_writebyte([data])
         epdconfig.digital_write(self.cs_pin, 1)
         
+    # send a whole buffer at once
+    def send_data2(self, data):
+        epdconfig.digital_write(self.cs_pin, 0)
+        epdconfig.digital_write(self.dc_pin, 1)
+        epdconfig.spi_writebyte2(data)
+        epdconfig.digital_write(self.cs_pin, 1)
+
     def ReadBusy(self):
         while(epdconfig.digital_read(self.busy_pin) == 1):      # 0: idle, 1: busy
             epdconfig.delay_ms(100)            
@@ -127,8 +135,7 @@ class EPD:
         
         # WRITE_LUT_REGISTER
         self.send_command(0x32)
-        for count in range(30):
-            self.send_data(lut[count])
+        self.send_data2(lut[0:30])
 
         return 0
         
@@ -158,31 +165,7 @@ class EPD:
         self.ReadBusy()
         
     def getbuffer(self, image):
-        if self.width%8 == 0:
-            linewidth = int(self.width/8)
-        else:
-            linewidth = int(self.width/8) + 1
-         
-        buf = [0xFF] * (linewidth * self.height)
-        image_monocolor = image.convert('1')
-        imwidth, imheight = image_monocolor.size
-        pixels = image_monocolor.load()
-        
-        if(imwidth == self.width and imheight == self.height):
-            for y in range(imheight):
-                for x in range(imwidth):                    
-                    if pixels[x, y] == 0:
-                        # x = imwidth - x
-                        buf[int(x / 8) + y * linewidth] &= ~(0x80 >> (x % 8))
-        elif(imwidth == self.height and imheight == self.width):
-            for y in range(imheight):
-                for x in range(imwidth):
-                    newx = y
-                    newy = self.height - x - 1
-                    if pixels[x, y] == 0:
-                        # newy = imwidth - newy - 1
-                        buf[int(newx / 8) + newy*linewidth] &= ~(0x80 >> (y % 8))
-        return buf   
+        return packing.pack(image, self.width, self.height)
 
         
     def display(self, image):
@@ -191,12 +174,12 @@ class EPD:
         else:
             linewidth = int(self.width/8) + 1
 
+        # the window is a whole row wide and the address counter wraps to the next row
+        # on its own (data entry mode 0x03), so the frame goes out in one transfer
         self.SetWindows(0, 0, self.width, self.height);
-        for j in range(0, self.height):
-            self.SetCursor(0, j);
-            self.send_command(0x24);
-            for i in range(0, linewidth):
-                self.send_data(image[i + j * linewidth])   
+        self.SetCursor(0, 0);
+        self.send_command(0x24);
+        self.send_data2(image[0:linewidth * self.height])
         self.TurnOnDisplay()
     
     def Clear(self, color):
@@ -206,11 +189,9 @@ class EPD:
             linewidth = int(self.width/8) + 1
 
         self.SetWindows(0, 0, self.width, self.height);
-        for j in range(0, self.height):
-            self.SetCursor(0, j);
-            self.send_command(0x24);
-            for i in range(0, linewidth):
-                self.send_data(color)   
+        self.SetCursor(0, 0);
+        self.send_command(0x24);
+        self.send_data2([color] * linewidth * self.height)
         self.TurnOnDisplay()
 
     def sleep(self):
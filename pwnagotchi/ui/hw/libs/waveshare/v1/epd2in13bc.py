@@ -28,6 +28,7 @@
 #
 
 from . import epdconfig
+from pwnagotchi.ui.hw.libs import packing
 import RPi.GPIO as GPIO
 # import numpy as np
 
@@ -65,6 +66,13 @@ class EPD:
         epdconfig.spi_writebyte([data])
         epdconfig.digital_write(self.cs_pin, GPIO.HIGH)
 
+    # send a whole buffer at once
+    def send_data2(self, data):
+        epdconfig.digital_write(self.dc_pin, GPIO.HIGH)
+        epdconfig.digital_write(self.cs_pin, GPIO.LOW)
+        epdconfig.spi_writebyte2(data)
+        epdconfig.digital_write(self.cs_pin, GPIO.HIGH)
+
     def ReadBusy(self):
         epdconfig.delay_ms(20)
         while(epdconfig.digital_read(self.busy_pin) == 0):      # 0: idle, 1: busy
@@ -97,29 +105,11 @@ class EPD:
         return 0
 
     def getbuffer(self, image):
-        buf = [0xFF] * (int(self.width/8) * self.height)
-        image_monocolor = image.convert('1')
-        imwidth, imheight = image_monocolor.size
-        pixels = image_monocolor.load()
-        if(imwidth == self.width and imheight == self.height):
-            for y in range(imheight):
-                for x in range(imwidth):
-                    # Set the bits for the column of pixels at the current position.
-                    if pixels[x, y] == 0:
-                        buf[int((x + y * self.width) / 8)] &= ~(0x80 >> (x % 8))
-        elif(imwidth == self.height and imheight == self.width):
-            for y in range(imheight):
-                for x in range(imwidth):
-                    newx = y
-                    newy = self.height - x - 1
-                    if pixels[x, y] == 0:
-                        buf[int((newx + newy*self.width) / 8)] &= ~(0x80 >> (y % 8))
-        return buf
+        return packing.pack(image, self.width, self.height)
 
     def displayBlack(self, imageblack):
         self.send_command(0x10)
-        for i in range(0, int(self.width * self.height / 8)):
-            self.send_data(imageblack[i])
+        self.send_data2(imageblack[0:int(self.width * self.height / 8)])
         self.send_command(0x92)
 
         self.send_command(0x12) # REFRESH
@@ -127,13 +117,11 @@ class EPD:
 
     def display(self, imageblack, imagecolor):
         self.send_command(0x10)
-        for i in range(0, int(self.width * self.height / 8)):
-            self.send_data(imageblack[i])
+        self.send_data2(imageblack[0:int(self.width * self.height / 8)])
         self.send_command(0x92)
 
         self.send_command(0x13)
-        for i in range(0, int(self.width * self.height / 8)):
-            self.send_data(imagecolor[i])
+        self.send_data2(imagecolor[0:int(self.width * self.height / 8)])
         self.send_command(0x92)
 
         self.send_command(0x12) # REFRESH
@@ -141,13 +129,11 @@ class EPD:
 
     def Clear(self):
         self.send_command(0x10)
-        for i in range(0, int(self.width * self.height / 8)):
-            self.send_data(0xFF)
+        self.send_data2([0xFF] * int(self.width * self.height / 8))
         self.send_command(0x92)
 
         self.send_command(0x13)
-        for i in range(0, int(self.width * self.height / 8)):
-            self.send_data(0xFF)
+        self.send_data2([0xFF] * int(self.width * self.height / 8))
         self.send_command(0x92)
 
         self.send_command(0x12) # REFRESH
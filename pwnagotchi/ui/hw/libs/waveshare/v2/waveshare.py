@@ -49,6 +49,7 @@ import time
 import spidev
 import RPi.GPIO as GPIO
 from PIL import Image
+from pwnagotchi.ui.hw.libs import packing
 
 # Pin definition
 RST_PIN = 17
@@ -76,6 +77,11 @@ def spi_writebyte(data):
     SPI.writebytes(data)
 
 
+# writebytes2 splits the buffer in transfers the driver can handle
+def spi_writebyte2(data):
+    SPI.writebytes2(data)
+
+
 def module_init():
     GPIO.setmode(GPIO.BCM)
     GPIO.setwarnings(False)
@@ -156,6 +162,11 @@ class EPD:
         digital_write(self.dc_pin, GPIO.HIGH)
         spi_writebyte([data])
 
+    # send a whole buffer at once
+    def send_data2(self, data):
+        digital_write(self.dc_pin, GPIO.HIGH)
+        spi_writebyte2(data)
+
     def wait_until_idle(self):
         while (digital_read(self.busy_pin) == 1):  # 0: idle, 1: busy
             delay_ms(100)
@@ -219,8 +230,7 @@ class EPD:
             self.send_data(self.lut_full_update[75])
 
             self.send_command(0x32)
-            for count in range(70):
-                self.send_data(self.lut_full_update[count])
+            self.send_data2(self.lut_full_update[0:70])
 
             self.send_command(0x4E)  # set RAM x address count to 0
             self.send_data(0x00)
@@ -235,8 +245,7 @@ class EPD:
             self.wait_until_idle()
 
             self.send_command(0x32)
-            for count in range(70):
-                self.send_data(self.lut_partial_update[count])
+            self.send_data2(self.lut_partial_update[0:70])
 
             self.send_command(0x37)
             self.send_data(0x00)
@@ -257,33 +266,7 @@ class EPD:
         return 0
 
     def getbuffer(self, image):
-        if self.width % 8 == 0:
-            linewidth = self.width // 8
-        else:
-            linewidth = self.width // 8 + 1
-
-        buf = [0xFF] * (linewidth * self.height)
-        image_monocolor = image.convert('1')
-        imwidth, imheight = image_monocolor.size
-        pixels = image_monocolor.load()
-
-        if (imwidth == self.width and imheight == self.height):
-            # print("Vertical")
-            for y in range(imheight):
-                for x in range(imwidth):
-                    if pixels[x, y] == 0:
-                        x = imwidth - x
-                        buf[x // 8 + y * linewidth] &= ~(0x80 >> (x % 8))
-        elif (imwidth == self.height and imheight == self.width):
-            # print("Horizontal")
-            for y in range(imheight):
-                for x in range(imwidth):
-                    newx = y
-                    newy = self.height - x - 1
-                    if pixels[x, y] == 0:
-                        newy = imwidth - newy - 1
-                        buf[newx // 8 + newy * linewidth] &= ~(0x80 >> (y % 8))
-        return buf
+        return packing.pack_mirrored(image, self.width, self.height)
 
     def display(self, image):
         if self.width % 8 == 0:
@@ -292,9 +275,7 @@ class EPD:
             linewidth = self.width // 8 + 1
 
         self.send_command(0x24)
-        for j in range(0, self.height):
-            for i in range(0, linewidth):
-                self.send_data(image[i + j * linewidth])
+        self.send_data2(image[0:linewidth * self.height])
         self.TurnOnDisplay()
 
     def displayPartial(self, image):
@@ -304,13 +285,48 @@ class EPD:
             linewidth = self.width // 8 + 1
 
         self.send_command(0x24)
-        for j in range(0, self.height):
-            for i in range(0, linewidth):
-                self.send_data(image[i + j * linewidth])
+        self.send_data2(image[0:linewidth * self.height])
         self.send_command(0x26)
-        for j in range(0, self.height):
-            for i in range(0, linewidth):
-                self.send_data(~image[i + j * linewidth])
+        self.send_data2(packing.invert(image[0:linewidth * self.height]))
+        self.TurnOnDisplay()
+
+    # x in bytes, y in RAM rows, which count down from the first row of the buffer
+    def SetWindow(self, x_start, y_start, x_end, y_end):
+        self.send_command(0x44)  # set Ram-X address start//end position
+        self.send_data(x_start & 0xFF)
+        self.send_data(x_end & 0xFF)
+
+        self.send_command(0x45)  # set Ram-Y address start//end position
+        self.send_data(y_start & 0xFF)
+        self.send_data((y_start >> 8) & 0xFF)
+        self.send_data(y_end & 0xFF)
+        self.send_data((y_end >> 8) & 0xFF)
+
+    def SetCursor(self, x, y):
+        self.send_command(0x4E)  # set RAM x address count
+        self.send_data(x & 0xFF)
+        self.send_command(0x4F)  # set RAM y address count
+        self.send_data(y & 0xFF)
+        self.send_data((y >> 8) & 0xFF)
+
+    # same as displayPartial, but only the (first byte, first row, last byte, last row) windows are sent
+    def displayPartialWindows(self, image, windows):
+        if self.width % 8 == 0:
+            linewidth = self.width // 8
+        else:
+            linewidth = self.width // 8 + 1
+        last = self.height - 1
+
+        for command, data in ((0x24, image), (0x26, packing.invert(image))):
+            for x0, y0, x1, y1 in windows:
+                self.SetWindow(x0, last - y0, x1, last - y1)
+                self.SetCursor(x0, last - y0)
+                self.send_command(command)
+                self.send_data2(packing.crop(data, self.width, (x0, y0, x1, y1)))
+
+        # back to the whole panel for the next full update
+        self.SetWindow(0, last, linewidth - 1, 0)
+        self.SetCursor(0, last)
         self.TurnOnDisplay()
 
     def Clear(self, color):
@@ -321,9 +337,7 @@ class EPD:
         # print(linewidth)
 
         self.send_command(0x24)
-        for j in range(0, self.height):
-            for i in range(0, linewidth):
-                self.send_data(color)
+        self.send_data2([color] * (linewidth * self.height))
         self.TurnOnDisplay()
 
     def sleep(self):
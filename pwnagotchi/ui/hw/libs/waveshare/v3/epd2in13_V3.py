@@ -30,6 +30,7 @@
 
 import logging
 from . import epdconfig
+from pwnagotchi.ui.hw.libs import packing
 import numpy as np
 
 # Display resolution
@@ -124,6 +125,13 @@ class EPD:
         epdconfig.digital_write(self.cs_pin, 0)
         epdconfig.spi_writebyte([data])
         epdconfig.digital_write(self.cs_pin, 1)
+
+    # send a whole buffer at once
+    def send_data2(self, data):
+        epdconfig.digital_write(self.dc_pin, 1)
+        epdconfig.digital_write(self.cs_pin, 0)
+        epdconfig.spi_writebyte2(data)
+        epdconfig.digital_write(self.cs_pin, 1)
     
     '''
     function :Wait until the busy_pin goes LOW
@@ -162,8 +170,7 @@ class EPD:
     '''    
     def Lut(self, lut):
         self.send_command(0x32)
-        for i in range(0, 153):
-            self.send_data(lut[i])
+        self.send_data2(lut[0:153])
         self.ReadBusy()
     
     '''
@@ -292,9 +299,7 @@ class EPD:
             linewidth = int(self.width/8) + 1
 
         self.send_command(0x24)
-        for j in range(0, self.height):
-            for i in range(0, linewidth):
-                self.send_data(image[i + j * linewidth])   
+        self.send_data2(image[0:linewidth * self.height])
         self.TurnOnDisplay()
     
     '''
@@ -308,6 +313,39 @@ class EPD:
         else:
             linewidth = int(self.width/8) + 1
 
+        self.PartialMode()
+
+        self.SetWindow(0, 0, self.width - 1, self.height - 1)
+        self.SetCursor(0, 0)
+        
+        self.send_command(0x24) # WRITE_RAM
+        self.send_data2(image[0:linewidth * self.height])
+        self.TurnOnDisplayPart()
+
+    '''
+    function : Sends only some windows of the image buffer to e-Paper and partial refresh
+    parameter:
+        image : Image data
+        windows : (first byte, first row, last byte, last row) regions to send
+    '''
+    def displayPartialWindows(self, image, windows):
+        self.PartialMode()
+
+        for x0, y0, x1, y1 in windows:
+            self.SetWindow(x0 * 8, y0, x1 * 8 + 7, y1)
+            self.SetCursor(x0, y0)
+            self.send_command(0x24) # WRITE_RAM
+            self.send_data2(packing.crop(image, self.width, (x0, y0, x1, y1)))
+
+        self.SetWindow(0, 0, self.width - 1, self.height - 1)
+        self.SetCursor(0, 0)
+        self.TurnOnDisplayPart()
+
+    '''
+    function : Sets up the partial refresh waveform
+    parameter:
+    '''
+    def PartialMode(self):
         epdconfig.digital_write(self.reset_pin, 0)
         epdconfig.delay_ms(1)
         epdconfig.digital_write(self.reset_pin, 1)  
@@ -333,15 +371,6 @@ class EPD:
         self.send_command(0x20)
         self.ReadBusy()
 
-        self.SetWindow(0, 0, self.width - 1, self.height - 1)
-        self.SetCursor(0, 0)
-        
-        self.send_command(0x24) # WRITE_RAM
-        for j in range(0, self.height):
-            for i in range(0, linewidth):
-                self.send_data(image[i + j * linewidth])   
-        self.TurnOnDisplayPart()
-
     '''
     function : Refresh a base image
     parameter:
@@ -354,14 +383,10 @@ class EPD:
             linewidth = int(self.width/8) + 1
 
         self.send_command(0x24)
-        for j in range(0, self.height):
-            for i in range(0, linewidth):
-                self.send_data(image[i + j * linewidth])   
+        self.send_data2(image[0:linewidth * self.height])
                 
         self.send_command(0x26)
-        for j in range(0, self.height):
-            for i in range(0, linewidth):
-                self.send_data(image[i + j * linewidth])  
+        self.send_data2(image[0:linewidth * self.height])
         self.TurnOnDisplay()
     
     '''
@@ -376,9 +401,7 @@ class EPD:
         # logger.debug(linewidth)
         
         self.send_command(0x24)
-        for j in range(0, self.height):
-            for i in range(0, linewidth):
-                self.send_data(color)
+        self.send_data2([color] * (linewidth * self.height))
                 
         self.TurnOnDisplay()
 
@@ -1,5 +1,7 @@
 import logging
 
+from PIL import Image
+
 import pwnagotchi.ui.fonts as fonts
 from pwnagotchi.ui.hw.base import DisplayImpl
 
@@ -37,16 +39,16 @@ class Spotpear24inch(DisplayImpl):
         time.sleep(0.1)
 
     def initialize(self):
-        from pwnagotchi.ui.hw.libs.fb import fb
-        self._display = fb
+        from pwnagotchi.ui.hw.libs.fb.framebuffer import Framebuffer
         logging.info("initializing spotpear 24inch lcd display")
-        self._display.ready_fb(i=1)
-        self._display.black_scr()
+        self._display = Framebuffer('/dev/fb1')
+        self._display.fill(0, 0, 0)
 
     def render(self, canvas):
-        self._display.show_img(canvas.rotate(180))
-        self.refresh()
+        # only the rows that changed are written, if none did there's nothing to wait for
+        if self._display.show(canvas.transpose(Image.ROTATE_180)):
+            self.refresh()
 
     def clear(self):
-        self._display.black_scr()
+        self._display.fill(0, 0, 0)
         self.refresh()
@@ -0,0 +1,137 @@
+import collections
+import copy
+import logging
+import tempfile
+import time
+
+from pwnagotchi.ui.hw.base import DisplayImpl
+from pwnagotchi.ui.hw.libs import packing
+
+# how each panel talks to its controller, the ones not listed here get whole e-paper buffers
+BUSES = {
+    'waveshare_2': 'epd_windows_mirrored',
+    'waveshare_3': 'epd_windows',
+    'oledhat': 'oled_pages',
+    'adafruitssd1306i2c': 'oled_pages',
+    'lcdhat': 'rgb565',
+    'waveshare144lcd': 'rgb565',
+    'waveshare35lcd': 'framebuffer',
+    'spotpear24inch': 'framebuffer',
+}
+
+
+class Frame(object):
+    def __init__(self, image, kind, sent, pack, transfer):
+        self.time = time.time()
+        self.image = image
+        # full, partial or clean
+        self.kind = kind
+        # bytes that would have gone over the bus
+        self.sent = sent
+        self.pack = pack
+        self.transfer = transfer
+
+
+class Virtual(DisplayImpl):
+    """
+    A display without hardware behind it. It takes the layout and the refresh intervals of
+    the panel it emulates, packs every frame the way that panel's driver would and keeps
+    the frames and the bytes they'd have sent, sleeping for as long as the panel would take.
+    """
+
+    def __init__(self, config):
+        super(Virtual, self).__init__(config, 'virtual')
+        from pwnagotchi.ui.hw import display_for
+
+        options = self.config['virtual']
+        if options['panel'] == 'virtual':
+            raise ValueError("a virtual display can't emulate another virtual display")
+        emulated = copy.deepcopy(config)
+        emulated['ui']['display']['type'] = options['panel']
+        self._panel = display_for(emulated)
+        if self._panel is None:
+            raise ValueError("unsupported virtual panel %s" % options['panel'])
+
+        self.panel = options['panel']
+        self.bus = BUSES.get(self.panel, 'epd')
+        self.min_refresh = self._panel.min_refresh
+        self.full_refresh = self._panel.full_refresh
+        # seconds each refresh takes once the data has been sent, and bits per second of the bus (0 is instant)
+        self._latency = options['latency']
+        self._bus_speed = options['bus_speed']
+        self.frames = collections.deque(maxlen=options['history'])
+        self.sent = 0
+        self._last = None
+        self._fb = None
+        self._fb_file = None
+
+    def layout(self):
+        self._layout = self._panel.layout()
+        return self._layout
+
+    def initialize(self):
+        logging.info("initializing virtual display (%s, %s bus)" % (self.panel, self.bus))
+        if self.bus == 'framebuffer':
+            from pwnagotchi.ui.hw.libs.fb.framebuffer import Framebuffer
+            self._fb_file = tempfile.NamedTemporaryFile(prefix='pwnagotchi-fb-')
+            self._fb = Framebuffer(self._fb_file.name, self._layout['width'], self._layout['height'], 16)
+
+    def _encode(self, canvas, rects):
+        """
+        Packs the frame like the driver would and returns how many bytes it'd send
+        """
+        width, height = canvas.size
+
+        if self.bus in ('epd_windows', 'epd_windows_mirrored'):
+            mirrored = self.bus == 'epd_windows_mirrored'
+            pack = packing.pack_mirrored if mirrored else packing.pack
+            buf = pack(canvas, height, width)
+            windows = packing.windows(rects, canvas.size, height, width, mirrored=mirrored) if rects else None
+            chunks = [buf] if windows is None else [packing.crop(buf, height, win) for win in windows]
+            # the 2.13 v2 sends the inverted plane as well
+            return sum(len(chunk) for chunk in chunks) * (2 if mirrored else 1)
+
+        elif self.bus == 'oled_pages':
+            buf = packing.pack_pages(canvas, width, height)
+            dirty = packing.dirty_pages(self._last, buf, width)
+            self._last = buf
+            return 0 if dirty is None else (dirty[1] - dirty[0] + 1) * width
+
+        elif self.bus == 'rgb565':
+            from pwnagotchi.ui.hw.libs import rgb565
+            self._last = rgb565.convert(canvas, self._last)
+            windows = rgb565.windows(rects, width, height)
+            if windows is None:
+                return self._last.size
+            return sum(rgb565.crop(self._last, win).size for win in windows)
+
+        elif self.bus == 'framebuffer':
+            return self._fb.show(canvas) * width * self._fb.bytepp
+
+        return len(packing.pack(canvas, width, height))
+
+    def _push(self, canvas, rects, kind):
+        started = time.time()
+        sent = self._encode(canvas, rects)
+        pack = time.time() - started
+
+        transfer = self._latency
+        if self._bus_speed > 0:
+            transfer += sent * 8.0 / self._bus_speed
+        if transfer > 0:
+            time.sleep(transfer)
+
+        self.sent += sent
+        self.frames.append(Frame(canvas.copy(), kind, sent, pack, transfer))
+
+    def render(self, canvas):
+        self._push(canvas, None, 'full')
+
+    def render_partial(self, canvas, rects):
+        self._push(canvas, rects, 'partial')
+
+    def render_full(self, canvas):
+        self._push(canvas, None, 'clean')
+
+    def clear(self):
+        self._last = None
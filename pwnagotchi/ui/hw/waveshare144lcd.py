@@ -41,6 +41,9 @@ class Waveshare144lcd(DisplayImpl):
     def render(self, canvas):
         self._display.display(canvas)
 
+    def render_partial(self, canvas, rects):
+        self._display.display(canvas, rects)
+
     def clear(self):
         pass
         #self._display.clear()
@@ -2,12 +2,15 @@ import logging
 
 import pwnagotchi.ui.fonts as fonts
 from pwnagotchi.ui.hw.base import DisplayImpl
+from pwnagotchi.ui.hw.libs import packing
 
 
 class WaveshareV2(DisplayImpl):
     def __init__(self, config):
         super(WaveshareV2, self).__init__(config, 'waveshare_2')
         self._display = None
+        self.min_refresh = 1.0
+        self.full_refresh = 600.0
 
     def layout(self):
         if self.config['color'] == 'black':
@@ -65,5 +68,17 @@ class WaveshareV2(DisplayImpl):
         buf = self._display.getbuffer(canvas)
         self._display.displayPartial(buf)
 
+    def render_full(self, canvas):
+        self._display.init(self._display.FULL_UPDATE)
+        self._display.display(self._display.getbuffer(canvas))
+        self._display.init(self._display.PART_UPDATE)
+
+    def render_partial(self, canvas, rects):
+        windows = packing.windows(rects, canvas.size, self._display.width, self._display.height, mirrored=True)
+        if windows is None:
+            self.render(canvas)
+        elif windows:
+            self._display.displayPartialWindows(self._display.getbuffer(canvas), windows)
+
     def clear(self):
         self._display.Clear(0xff)
@@ -2,12 +2,15 @@ import logging
 
 import pwnagotchi.ui.fonts as fonts
 from pwnagotchi.ui.hw.base import DisplayImpl
+from pwnagotchi.ui.hw.libs import packing
 
 
 class WaveshareV3(DisplayImpl):
     def __init__(self, config):
         super(WaveshareV3, self).__init__(config, 'waveshare_3')
         self._display = None
+        self.min_refresh = 1.0
+        self.full_refresh = 600.0
 
     def layout(self):
         fonts.setup(10, 8, 10, 35, 25, 9)
@@ -43,6 +46,17 @@ class WaveshareV3(DisplayImpl):
         buf = self._display.getbuffer(canvas)
         self._display.displayPartial(buf)
 
+    def render_full(self, canvas):
+        self._display.init()
+        self._display.displayPartBaseImage(self._display.getbuffer(canvas))
+
+    def render_partial(self, canvas, rects):
+        windows = packing.windows(rects, canvas.size, self._display.width, self._display.height, mirrored=False)
+        if windows is None:
+            self.render(canvas)
+        elif windows:
+            self._display.displayPartialWindows(self._display.getbuffer(canvas), windows)
+
     def clear(self):
         #pass
         self._display.Clear(0xFF)
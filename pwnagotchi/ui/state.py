@@ -1,59 +1,139 @@
-from threading import Lock
+import logging
+import queue
+import threading
+from contextlib import contextmanager
 
 
 class State(object):
+    """
+    The elements of the ui and their values. Every write publishes new dictionaries instead
+    of changing the ones readers might be looking at, so reads don't need the lock and
+    writers only contend with each other. Listeners are called by a background thread once
+    the change has been committed, never while the lock is held.
+    """
+
     def __init__(self, state={}):
-        self._state = state
-        self._lock = Lock()
-        self._listeners = {}
+        # none of these dictionaries is changed once published, they're replaced
+        self._state = dict(state)
+        self._values = {key: getattr(elem, 'value', None) for key, elem in self._state.items()}
         self._changes = {}
+        self._listeners = {}
+        self._lock = threading.Lock()
+        # updates staged by the batch a thread is in, if any
+        self._local = threading.local()
+        self._events = queue.Queue()
+        self._dispatcher = None
 
     def add_element(self, key, elem):
-        self._state[key] = elem
-        self._changes[key] = True
+        with self._lock:
+            state, values, changes = dict(self._state), dict(self._values), dict(self._changes)
+            state[key] = elem
+            values[key] = getattr(elem, 'value', None)
+            changes[key] = True
+            self._state, self._values, self._changes = state, values, changes
 
     def has_element(self, key):
         return key in self._state
 
     def remove_element(self, key):
-        del self._state[key]
-        self._changes[key] = True
+        with self._lock:
+            state, values, changes = dict(self._state), dict(self._values), dict(self._changes)
+            del state[key]
+            values.pop(key, None)
+            changes[key] = True
+            self._state, self._values, self._changes = state, values, changes
 
     def add_listener(self, key, cb):
         with self._lock:
-            self._listeners[key] = cb
+            listeners = dict(self._listeners)
+            listeners[key] = cb
+            self._listeners = listeners
 
     def items(self):
-        with self._lock:
-            return self._state.items()
+        return self._state.items()
 
     def get(self, key):
-        with self._lock:
-            return self._state[key].value if key in self._state else None
+        return self._values.get(key)
 
-    def reset(self):
+    def snapshot(self):
+        """
+        Returns the {key: value} of the last commit, it won't change under the caller's feet
+        """
+        return self._values
+
+    def reset(self, keys=None):
         with self._lock:
-            self._changes = {}
+            if keys is None:
+                self._changes = {}
+            else:
+                self._changes = {key: True for key in self._changes if key not in keys}
 
     def changes(self, ignore=()):
-        with self._lock:
-            changes = []
-            for change in self._changes.keys():
-                if change not in ignore:
-                    changes.append(change)
-            return changes
+        return [change for change in self._changes if change not in ignore]
 
     def has_changes(self):
-        with self._lock:
-            return len(self._changes) > 0
+        return len(self._changes) > 0
+
+    @contextmanager
+    def batch(self):
+        """
+        The values set in here are committed all at once when the block is over, so that they
+        end up in the same change set. Until then, get returns the previous values.
+        """
+        if getattr(self._local, 'pending', None) is not None:
+            # nested, the outermost batch commits
+            yield
+            return
+
+        self._local.pending = {}
+        try:
+            yield
+        finally:
+            pending, self._local.pending = self._local.pending, None
+            self._commit(pending)
 
     def set(self, key, value):
+        pending = getattr(self._local, 'pending', None)
+        if pending is not None:
+            pending[key] = value
+        else:
+            self._commit({key: value})
+
+    def _commit(self, updates):
+        notify = []
         with self._lock:
-            if key in self._state:
-                prev = self._state[key].value
-                self._state[key].value = value
+            values, changes = None, None
+            for key, value in updates.items():
+                if key not in self._state:
+                    continue
+
+                elem = self._state[key]
+                prev = getattr(elem, 'value', None)
+                elem.value = value
+                if values is None:
+                    values, changes = dict(self._values), dict(self._changes)
+                values[key] = value
 
                 if prev != value:
-                    self._changes[key] = True
-                    if key in self._listeners and self._listeners[key] is not None:
-                        self._listeners[key](prev, value)
+                    changes[key] = True
+                    if self._listeners.get(key) is not None:
+                        notify.append((self._listeners[key], prev, value))
+
+            if values is not None:
+                self._values, self._changes = values, changes
+
+            # queued while still holding the lock, so they're in the same order as the commits
+            if notify and self._dispatcher is None:
+                self._dispatcher = threading.Thread(target=self._dispatch, daemon=True)
+                self._dispatcher.start()
+            for event in notify:
+                self._events.put(event)
+
+    def _dispatch(self):
+        # a single thread, so that listeners see the changes in the order they've been made
+        while True:
+            cb, prev, value = self._events.get()
+            try:
+                cb(prev, value)
+            except Exception as e:
+                logging.exception("error in state listener %s: %s" % (cb, e))
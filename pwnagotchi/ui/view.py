@@ -12,6 +12,7 @@ import pwnagotchi.ui.faces as faces
 import pwnagotchi.ui.fonts as fonts
 import pwnagotchi.ui.web as web
 import pwnagotchi.utils as utils
+import pwnagotchi.ui.components as components
 from pwnagotchi.ui.components import *
 from pwnagotchi.ui.state import State
 from pwnagotchi.voice import Voice
@@ -32,6 +33,10 @@ class View(object):
         self._render_cbs = []
         self._config = config
         self._canvas = None
+        # persistent drawing surface, only the damaged regions are redrawn on it
+        self._frame = None
+        # what each element covered in the last frame
+        self._bboxes = {}
         self._frozen = False
         self._lock = Lock()
         self._voice = Voice(lang=config['main']['lang'])
@@ -77,6 +82,9 @@ class View(object):
                          font=fonts.Bold, color=BLACK),
         })
 
+        # faces are a small fixed set, rasterize them once
+        text_cache.prerender(fonts.Huge, faces.all_faces())
+
         if state:
             for key, value in state.items():
                 self._state.set(key, value)
@@ -113,9 +121,13 @@ class View(object):
     def on_state_change(self, key, cb):
         self._state.add_listener(key, cb)
 
-    def on_render(self, cb):
-        if cb not in self._render_cbs:
-            self._render_cbs.append(cb)
+    def on_render(self, cb, with_rects=False):
+        """
+        Registers cb to be called with every new frame, if with_rects is True
+        it'll also receive the list of (left, top, right, bottom) regions that changed
+        """
+        if cb not in [c for c, _ in self._render_cbs]:
+            self._render_cbs.append((cb, with_rects))
 
     def _refresh_handler(self):
         delay = 1.0 / self._config['ui']['fps']
@@ -142,21 +154,20 @@ class View(object):
 
     def on_ai_ready(self):
         self.set('mode', '  AI')
-        self.set('face', faces.HAPPY)
-        self.set('status', self._voice.on_ai_ready())
-        self.update()
+        self.update(new_data={'face': faces.HAPPY, 'status': self._voice.on_ai_ready()})
 
     def on_manual_mode(self, last_session):
-        self.set('mode', 'MANU')
-        self.set('face', faces.SAD if (last_session.epochs > 3 and last_session.handshakes == 0) else faces.HAPPY)
-        self.set('status', self._voice.on_last_session_data(last_session))
-        self.set('epoch', "%04d" % last_session.epochs)
-        self.set('uptime', last_session.duration)
-        self.set('channel', '-')
-        self.set('aps', "%d" % last_session.associated)
-        self.set('shakes', '%d (%s)' % (last_session.handshakes, \
-                                        utils.total_unique_handshakes(self._config['bettercap']['handshakes'])))
-        self.set_closest_peer(last_session.last_peer, last_session.peers)
+        with self._state.batch():
+            self.set('mode', 'MANU')
+            self.set('face', faces.SAD if (last_session.epochs > 3 and last_session.handshakes == 0) else faces.HAPPY)
+            self.set('status', self._voice.on_last_session_data(last_session))
+            self.set('epoch', "%04d" % last_session.epochs)
+            self.set('uptime', last_session.duration)
+            self.set('channel', '-')
+            self.set('aps', "%d" % last_session.associated)
+            self.set('shakes', '%d (%s)' % (last_session.handshakes, \
+                                            utils.total_unique_handshakes(self._config['bettercap']['handshakes'])))
+            self._set_closest_peer(last_session.last_peer, last_session.peers)
         self.update()
 
     def is_normal(self):
@@ -173,16 +184,17 @@ class View(object):
             faces.LONELY)
 
     def on_keys_generation(self):
-        self.set('face', faces.AWAKE)
-        self.set('status', self._voice.on_keys_generation())
-        self.update()
+        self.update(new_data={'face': faces.AWAKE, 'status': self._voice.on_keys_generation()})
 
     def on_normal(self):
-        self.set('face', faces.AWAKE)
-        self.set('status', self._voice.on_normal())
-        self.update()
+        self.update(new_data={'face': faces.AWAKE, 'status': self._voice.on_normal()})
 
     def set_closest_peer(self, peer, num_total):
+        self._set_closest_peer(peer, num_total)
+        self.update()
+
+    # sets the friend fields without drawing them, so that they can be part of a bigger batch
+    def _set_closest_peer(self, peer, num_total):
         if peer is None:
             self.set('friend_face', None)
             self.set('friend_name', None)
@@ -209,7 +221,6 @@ class View(object):
 
             self.set('friend_face', peer.face())
             self.set('friend_name', name)
-        self.update()
 
     def on_new_peer(self, peer):
         face = ''
@@ -223,25 +234,17 @@ class View(object):
         else:
             face = random.choice((faces.EXCITED, faces.HAPPY, faces.SMART))
 
-        self.set('face', face)
-        self.set('status', self._voice.on_new_peer(peer))
-        self.update()
+        self.update(new_data={'face': face, 'status': self._voice.on_new_peer(peer)})
         time.sleep(3)
 
     def on_lost_peer(self, peer):
-        self.set('face', faces.LONELY)
-        self.set('status', self._voice.on_lost_peer(peer))
-        self.update()
+        self.update(new_data={'face': faces.LONELY, 'status': self._voice.on_lost_peer(peer)})
 
     def on_free_channel(self, channel):
-        self.set('face', faces.SMART)
-        self.set('status', self._voice.on_free_channel(channel))
-        self.update()
+        self.update(new_data={'face': faces.SMART, 'status': self._voice.on_free_channel(channel)})
 
     def on_reading_logs(self, lines_so_far=0):
-        self.set('face', faces.SMART)
-        self.set('status', self._voice.on_reading_logs(lines_so_far))
-        self.update()
+        self.update(new_data={'face': faces.SMART, 'status': self._voice.on_reading_logs(lines_so_far)})
 
     def wait(self, secs, sleeping=True):
         was_normal = self.is_normal()
@@ -253,20 +256,21 @@ class View(object):
             # a while, otherwise the sleep animation will
             # always override any minor state change before it
             if was_normal or step > 5:
-                if sleeping:
-                    if secs > 1:
-                        self.set('face', faces.SLEEP)
-                        self.set('status', self._voice.on_napping(int(secs)))
+                with self._state.batch():
+                    if sleeping:
+                        if secs > 1:
+                            self.set('face', faces.SLEEP)
+                            self.set('status', self._voice.on_napping(int(secs)))
+                        else:
+                            self.set('face', faces.SLEEP2)
+                            self.set('status', self._voice.on_awakening())
                     else:
-                        self.set('face', faces.SLEEP2)
-                        self.set('status', self._voice.on_awakening())
-                else:
-                    self.set('status', self._voice.on_waiting(int(secs)))
-                    good_mood = self._agent.in_good_mood()
-                    if step % 2 == 0:
-                        self.set('face', faces.LOOK_R_HAPPY if good_mood else faces.LOOK_R)
-                    else:
-                        self.set('face', faces.LOOK_L_HAPPY if good_mood else faces.LOOK_L)
+                        self.set('status', self._voice.on_waiting(int(secs)))
+                        good_mood = self._agent.in_good_mood()
+                        if step % 2 == 0:
+                            self.set('face', faces.LOOK_R_HAPPY if good_mood else faces.LOOK_R)
+                        else:
+                            self.set('face', faces.LOOK_L_HAPPY if good_mood else faces.LOOK_L)
 
             time.sleep(part)
             secs -= part
@@ -274,95 +278,63 @@ class View(object):
         self.on_normal()
 
     def on_shutdown(self):
-        self.set('face', faces.SLEEP)
-        self.set('status', self._voice.on_shutdown())
-        self.update(force=True)
+        self.update(force=True, new_data={'face': faces.SLEEP, 'status': self._voice.on_shutdown()})
         self._frozen = True
 
     def on_bored(self):
-        self.set('face', faces.BORED)
-        self.set('status', self._voice.on_bored())
-        self.update()
+        self.update(new_data={'face': faces.BORED, 'status': self._voice.on_bored()})
 
     def on_sad(self):
-        self.set('face', faces.SAD)
-        self.set('status', self._voice.on_sad())
-        self.update()
+        self.update(new_data={'face': faces.SAD, 'status': self._voice.on_sad()})
 
     def on_angry(self):
-        self.set('face', faces.ANGRY)
-        self.set('status', self._voice.on_angry())
-        self.update()
+        self.update(new_data={'face': faces.ANGRY, 'status': self._voice.on_angry()})
 
     def on_motivated(self, reward):
-        self.set('face', faces.MOTIVATED)
-        self.set('status', self._voice.on_motivated(reward))
-        self.update()
+        self.update(new_data={'face': faces.MOTIVATED, 'status': self._voice.on_motivated(reward)})
 
     def on_demotivated(self, reward):
-        self.set('face', faces.DEMOTIVATED)
-        self.set('status', self._voice.on_demotivated(reward))
-        self.update()
+        self.update(new_data={'face': faces.DEMOTIVATED, 'status': self._voice.on_demotivated(reward)})
 
     def on_excited(self):
-        self.set('face', faces.EXCITED)
-        self.set('status', self._voice.on_excited())
-        self.update()
+        self.update(new_data={'face': faces.EXCITED, 'status': self._voice.on_excited()})
 
     def on_assoc(self, ap):
-        self.set('face', faces.INTENSE)
-        self.set('status', self._voice.on_assoc(ap))
-        self.update()
+        self.update(new_data={'face': faces.INTENSE, 'status': self._voice.on_assoc(ap)})
 
     def on_deauth(self, sta):
-        self.set('face', faces.COOL)
-        self.set('status', self._voice.on_deauth(sta))
-        self.update()
+        self.update(new_data={'face': faces.COOL, 'status': self._voice.on_deauth(sta)})
 
     def on_miss(self, who):
-        self.set('face', faces.SAD)
-        self.set('status', self._voice.on_miss(who))
-        self.update()
+        self.update(new_data={'face': faces.SAD, 'status': self._voice.on_miss(who)})
 
     def on_grateful(self):
-        self.set('face', faces.GRATEFUL)
-        self.set('status', self._voice.on_grateful())
-        self.update()
+        self.update(new_data={'face': faces.GRATEFUL, 'status': self._voice.on_grateful()})
 
     def on_lonely(self):
-        self.set('face', faces.LONELY)
-        self.set('status', self._voice.on_lonely())
-        self.update()
+        self.update(new_data={'face': faces.LONELY, 'status': self._voice.on_lonely()})
 
     def on_handshakes(self, new_shakes):
-        self.set('face', faces.HAPPY)
-        self.set('status', self._voice.on_handshakes(new_shakes))
-        self.update()
+        self.update(new_data={'face': faces.HAPPY, 'status': self._voice.on_handshakes(new_shakes)})
 
     def on_unread_messages(self, count, total):
-        self.set('face', faces.EXCITED)
-        self.set('status', self._voice.on_unread_messages(count, total))
-        self.update()
+        self.update(new_data={'face': faces.EXCITED, 'status': self._voice.on_unread_messages(count, total)})
         time.sleep(5.0)
 
     def on_uploading(self, to):
-        self.set('face', random.choice((faces.UPLOAD, faces.UPLOAD1, faces.UPLOAD2)))
-        self.set('status', self._voice.on_uploading(to))
-        self.update(force=True)
+        self.update(force=True, new_data={'face': random.choice((faces.UPLOAD, faces.UPLOAD1, faces.UPLOAD2)), 'status': self._voice.on_uploading(to)})
 
     def on_rebooting(self):
-        self.set('face', faces.BROKEN)
-        self.set('status', self._voice.on_rebooting())
-        self.update()
+        self.update(new_data={'face': faces.BROKEN, 'status': self._voice.on_rebooting()})
 
     def on_custom(self, text):
-        self.set('face', faces.DEBUG)
-        self.set('status', self._voice.custom(text))
-        self.update()
+        self.update(new_data={'face': faces.DEBUG, 'status': self._voice.custom(text)})
 
     def update(self, force=False, new_data={}):
-        for key, val in new_data.items():
-            self.set(key, val)
+        # all of the new data ends up in the same frame
+        with self._state.batch():
+            for key, val in new_data.items():
+                self.set(key, val)
 
         with self._lock:
             if self._frozen:
@@ -371,17 +343,83 @@ class View(object):
             state = self._state
             changes = state.changes(ignore=self._ignore_changes)
             if force or len(changes):
-                self._canvas = Image.new('1', (self._width, self._height), WHITE)
-                drawer = ImageDraw.Draw(self._canvas)
+                if self._frame is None:
+                    self._frame = Image.new('1', (self._width, self._height), WHITE)
+                    force = True
+                drawer = ImageDraw.Draw(self._frame)
 
                 plugins.on('ui_update', self)
 
-                for key, lv in state.items():
-                    lv.draw(self._canvas, drawer)
-
-                web.update_frame(self._canvas)
+                # ignored changes are not worth a new frame, but are drawn if we're making one anyway
+                changed = state.changes()
+                rects = self._redraw(drawer, None if force else changed)
+                self._canvas = self._frame.copy()
 
-                for cb in self._render_cbs:
-                    cb(self._canvas)
+                values = state.snapshot()
+                web.update_frame(self._canvas, {key: values.get(key) for key in changed})
 
-                self._state.reset()
+                for cb, with_rects in self._render_cbs:
+                    if with_rects:
+                        cb(self._canvas, rects)
+                    else:
+                        cb(self._canvas)
+
+                # changes that happened while drawing will be picked up by the next frame
+                self._state.reset(changed)
+
+    def _redraw(self, drawer, changed):
+        """
+        Redraws the elements affected by the changed keys (all of them if changed is None)
+        and returns the list of regions that have been redrawn
+        """
+        full = (0, 0, self._width - 1, self._height - 1)
+        elements = list(self._state.items())
+        bboxes = {}
+        damaged = []
+
+        for key, elem in elements:
+            bbox = self._bboxes.get(key) if changed is not None and key not in changed else None
+            if bbox is None:
+                try:
+                    bbox = elem.bbox(drawer)
+                except Exception as e:
+                    logging.debug("can't measure ui element %s: %s" % (key, e))
+            if bbox is None:
+                # we don't know what this element is going to draw
+                changed = None
+            bboxes[key] = bbox
+
+        if changed is None:
+            damaged = [full]
+            redraw = set(bboxes.keys())
+        else:
+            for key in changed:
+                # elements that moved or have been removed must be cleared from where they were
+                for bbox in (self._bboxes.get(key), bboxes.get(key)):
+                    if bbox is not None:
+                        damaged.append(bbox)
+
+            # anything overlapping a region we clear must be redrawn, and its own box cleared
+            redraw = set()
+            grown = True
+            while grown:
+                grown = False
+                for key, _ in elements:
+                    if key not in redraw and any(components.intersects(bboxes[key], r) for r in damaged):
+                        redraw.add(key)
+                        damaged.append(bboxes[key])
+                        grown = True
+
+        rects = []
+        for rect in damaged:
+            rect = (max(rect[0], 0), max(rect[1], 0), min(rect[2], full[2]), min(rect[3], full[3]))
+            if rect[0] <= rect[2] and rect[1] <= rect[3] and rect not in rects:
+                rects.append(rect)
+                drawer.rectangle(rect, fill=WHITE)
+
+        for key, elem in elements:
+            if key in redraw:
+                elem.draw(self._frame, drawer)
+
+        self._bboxes = bboxes
+        return rects
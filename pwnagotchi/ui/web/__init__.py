@@ -1,15 +1,124 @@
+import io
 import os
-from threading import Lock
+import time
+from threading import Lock, Event
 
 frame_path = '/var/tmp/pwnagotchi/pwnagotchi.png'
 frame_format = 'PNG'
 frame_ctype = 'image/png'
 frame_lock = Lock()
 
+# the latest frame is kept in memory and only encoded when someone asks for it
+_frame = None
+_frame_seq = 0
+_frame_encoded = (0, None)
+# makes etags from a previous run useless
+_frame_epoch = '%x' % int(time.time())
+# state key -> (sequence number of the frame it changed in, value)
+_frame_changes = {}
+# clients of the frames stream
+_subscribers = set()
+max_subscribers = 4
 
-def update_frame(img):
-    global frame_lock, frame_path, frame_format
-    if not os.path.exists(os.path.dirname(frame_path)):
-        os.makedirs(os.path.dirname(frame_path))
+
+class FrameSubscriber(object):
+    """
+    Receives a notification for every new frame, a slow subscriber doesn't get a backlog:
+    it just skips to the latest frame, with all the changes it missed merged together
+    """
+
+    def __init__(self):
+        self._event = Event()
+        self._seq = 0
+        self._event.set()
+
+    def notify(self):
+        self._event.set()
+
+    def wait(self, timeout=None):
+        """
+        Returns the (sequence number, {key: value}) tuple of the latest frame if it's
+        newer than the last one returned, None on timeout
+        """
+        global frame_lock
+        if not self._event.wait(timeout):
+            return None
+
+        with frame_lock:
+            self._event.clear()
+            if _frame is None or _frame_seq <= self._seq:
+                return None
+            changes = {key: value for key, (seq, value) in _frame_changes.items() if seq > self._seq}
+            self._seq = _frame_seq
+            return self._seq, changes
+
+
+def subscribe():
+    global frame_lock, max_subscribers
+    with frame_lock:
+        if len(_subscribers) >= max_subscribers:
+            return None
+        sub = FrameSubscriber()
+        _subscribers.add(sub)
+        return sub
+
+
+def unsubscribe(sub):
+    global frame_lock
+    with frame_lock:
+        _subscribers.discard(sub)
+
+
+def update_frame(img, changes=None):
+    global frame_lock, _frame, _frame_seq
     with frame_lock:
-        img.save(frame_path, format=frame_format)
+        _frame = img
+        _frame_seq += 1
+        if changes is not None:
+            for key, value in changes.items():
+                _frame_changes[key] = (_frame_seq, value)
+        # this only sets an event per client, the render path never waits for them
+        for sub in _subscribers:
+            sub.notify()
+
+
+def frame_seq():
+    with frame_lock:
+        return _frame_seq
+
+
+def frame_etag(seq):
+    return '%s-%d' % (_frame_epoch, seq)
+
+
+def get_frame():
+    """
+    Returns the (sequence number, encoded image) tuple of the latest frame, the
+    encoding is cached so that it's done at most once per frame
+    """
+    global frame_lock, frame_format, _frame_encoded
+    with frame_lock:
+        img, seq = _frame, _frame_seq
+        if img is None:
+            return seq, None
+        if _frame_encoded[0] == seq:
+            return _frame_encoded
+
+    # frames are never modified once published, no need to keep the lock while encoding
+    buf = io.BytesIO()
+    img.save(buf, format=frame_format)
+    encoded = (seq, buf.getvalue())
+
+    with frame_lock:
+        if _frame_encoded[0] < seq:
+            _frame_encoded = encoded
+    return encoded
+
+
+def save_frame(path=frame_path):
+    _, data = get_frame()
+    if data is not None:
+        if not os.path.exists(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+        with open(path, 'wb') as fp:
+            fp.write(data)
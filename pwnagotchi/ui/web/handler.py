@@ -15,7 +15,6 @@ import pwnagotchi.grid as grid
 import pwnagotchi.ui.web as web
 from pwnagotchi import plugins
 
-from flask import send_file
 from flask import Response
 from flask import request
 from flask import jsonify
@@ -32,6 +31,9 @@ class Handler:
 
         self._app.add_url_rule('/', 'index', self.with_auth(self.index))
         self._app.add_url_rule('/ui', 'ui', self.with_auth(self.ui))
+        self._app.add_url_rule('/ui/stream', 'ui_stream', self.with_auth(self.ui_stream))
+        self._app.add_url_rule('/ui/stats', 'ui_stats', self.with_auth(self.ui_stats))
+        self._app.add_url_rule('/server/stats', 'server_stats', self.with_auth(self.server_stats))
 
         self._app.add_url_rule('/shutdown', 'shutdown', self.with_auth(self.shutdown), methods=['POST'])
         self._app.add_url_rule('/reboot', 'reboot', self.with_auth(self.reboot), methods=['POST'])
@@ -182,6 +184,12 @@ class Handler:
         if name is None:
             return render_template('plugins.html', loaded=plugins.loaded, database=plugins.database)
 
+        if name == 'profile':
+            if subpath == 'json':
+                return jsonify({'dispatcher': plugins.dispatcher.stats(),
+                                'hooks': plugins.dispatcher.profiler.stats()})
+            return render_template('plugins_profile.html', hooks=plugins.dispatcher.profiler.stats())
+
         if name == 'toggle' and request.method == 'POST':
             checked = True if 'enabled' in request.form else False
             return 'success' if plugins.toggle_plugin(request.form['plugin'], checked) else 'failed'
@@ -222,7 +230,50 @@ class Handler:
         finally:
             _thread.start_new_thread(pwnagotchi.restart, (mode,))
 
-    # serve the PNG file with the display image
+    # serve the PNG with the display image, or a 304 if the browser has it already
     def ui(self):
-        with web.frame_lock:
-            return send_file(web.frame_path, mimetype='image/png')
+        etag = web.frame_etag(web.frame_seq())
+        if request.if_none_match.contains(etag):
+            return Response(status=304, headers={'ETag': '"%s"' % etag, 'Cache-Control': 'no-cache'})
+
+        seq, data = web.get_frame()
+        if data is None:
+            abort(404)
+
+        return Response(data, mimetype=web.frame_ctype,
+                        headers={'ETag': '"%s"' % web.frame_etag(seq), 'Cache-Control': 'no-cache'})
+
+    # server-sent events with the sequence number and the changed state of every new frame
+    def ui_stream(self):
+        sub = web.subscribe()
+        if sub is None:
+            abort(503)
+
+        def generate():
+            try:
+                yield 'retry: 2000\n\n'
+                while True:
+                    update = sub.wait(timeout=15.0)
+                    if update is None:
+                        # keeps proxies happy and lets us notice clients that went away
+                        yield ': ping\n\n'
+                        continue
+
+                    seq, changes = update
+                    data = json.dumps({'seq': seq, 'etag': web.frame_etag(seq), 'changes': changes}, default=str)
+                    yield 'id: %d\ndata: %s\n\n' % (seq, data)
+            finally:
+                web.unsubscribe(sub)
+
+        return Response(generate(), mimetype='text/event-stream',
+                        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+    # frames submitted to the display, and how many of them made it to the panel
+    def ui_stats(self):
+        view = self._agent.view()
+        return jsonify(view.render_stats() if hasattr(view, 'render_stats') else {})
+
+    # latency and concurrency of the web server
+    def server_stats(self):
+        import pwnagotchi.ui.web.wsgi as wsgi
+        return jsonify(wsgi.stats())
@@ -2,6 +2,7 @@ import _thread
 import secrets
 import logging
 import os
+import time
 
 # https://stackoverflow.com/questions/14888799/disable-console-messages-in-flask-server
 logging.getLogger('werkzeug').setLevel(logging.ERROR)
@@ -29,6 +30,7 @@ class Server:
 
     def _http_serve(self):
         if self._address is not None:
+            started = time.time()
             web_path = os.path.dirname(os.path.realpath(__file__))
 
             app = Flask(__name__,
@@ -44,8 +46,13 @@ class Server:
             CSRFProtect(app)
             Handler(self._config, self._agent, app)
 
-            logging.info("web ui available at http://%s:%d/" % (self._address, self._port))
+            logging.info("web ui available at http://%s:%d/ (%s server, set up in %.2fs)" % (
+                self._address, self._port, self._config['server'], time.time() - started))
 
-            app.run(host=self._address, port=self._port, debug=False)
+            if self._config['server'] == 'pool':
+                import pwnagotchi.ui.web.wsgi as wsgi
+                wsgi.serve(app, self._config)
+            else:
+                app.run(host=self._address, port=self._port, debug=False, threaded=True)
         else:
             logging.info("could not get ip of usb0, video server not starting")
@@ -0,0 +1,223 @@
+import gzip
+import logging
+import queue
+import threading
+import time
+
+from werkzeug.datastructures import Headers
+from werkzeug.serving import BaseWSGIServer, WSGIRequestHandler
+
+# the server currently running, if any
+server = None
+
+
+class RequestHandler(WSGIRequestHandler):
+    # allows keep-alive connections, responses without a length still close them
+    protocol_version = 'HTTP/1.1'
+    # idle keep-alive connections (and stuck clients) don't hold a worker forever
+    timeout = 5
+
+    def log_request(self, *args, **kwargs):
+        pass
+
+
+class _Tracked(object):
+    """
+    Wraps the response body so that the request is accounted for only once it's been sent,
+    and the worker rejoins the pool once a long lived response is over
+    """
+
+    def __init__(self, server, body, started, detached):
+        self._server = server
+        self._body = body
+        self._started = started
+        self._detached = detached
+
+    def __iter__(self):
+        return iter(self._body)
+
+    def close(self):
+        try:
+            if hasattr(self._body, 'close'):
+                self._body.close()
+        finally:
+            if self._detached:
+                self._server.attach()
+            self._server.track(time.time() - self._started)
+
+
+class Middleware(object):
+    """
+    Accounts for every request, gzips buffered JSON and HTML responses and lets streamed
+    responses (event streams and bodies without a Content-Length) run outside of the worker pool
+    """
+
+    compressible = ('application/json', 'text/html')
+    min_size = 512
+    # these never have a body, with or without a Content-Length
+    bodiless = ('204', '304')
+
+    def __init__(self, server, app, compress=True):
+        self._server = server
+        self._app = app
+        self._compress = compress
+
+    def _should_compress(self, environ, headers):
+        return self._compress and \
+               'gzip' in environ.get('HTTP_ACCEPT_ENCODING', '') and \
+               'Content-Encoding' not in headers and \
+               headers.get('Content-Type', '').split(';')[0].strip() in self.compressible and \
+               int(headers.get('Content-Length', 0)) >= self.min_size
+
+    def _is_stream(self, environ, status, headers):
+        code = status.split(' ', 1)[0]
+        if environ.get('REQUEST_METHOD') == 'HEAD' or code.startswith('1') or code in self.bodiless:
+            return False
+        if headers.get('Content-Type', '').split(';')[0].strip() == 'text/event-stream':
+            return True
+        # werkzeug only leaves the length out of responses built on a generator
+        return 'Content-Length' not in headers
+
+    def __call__(self, environ, start_response):
+        started = time.time()
+        self._server.enter()
+        try:
+            response = []
+
+            def capture(status, headers, exc_info=None):
+                response[:] = [status, headers, exc_info]
+
+            body = self._app(environ, capture)
+            status, headers, exc_info = response
+            headers = Headers(headers)
+        except Exception:
+            self._server.track(time.time() - started)
+            raise
+
+        detached = False
+        if self._is_stream(environ, status, headers):
+            detached = self._server.detach()
+
+        elif self._should_compress(environ, headers):
+            try:
+                data = gzip.compress(b''.join(body), compresslevel=5)
+            finally:
+                if hasattr(body, 'close'):
+                    body.close()
+            body = [data]
+            headers['Content-Encoding'] = 'gzip'
+            headers['Content-Length'] = str(len(data))
+            headers.add('Vary', 'Accept-Encoding')
+
+        start_response(status, headers.to_wsgi_list(), exc_info)
+        return _Tracked(self._server, body, started, detached)
+
+
+class PooledWSGIServer(BaseWSGIServer):
+    """
+    A WSGI server with a fixed pool of workers and a bounded queue of pending connections,
+    connections that don't fit in the queue are dropped
+    """
+
+    def __init__(self, host, port, app, workers=4, max_streams=4, backlog=16, keepalive=5.0, compress=True):
+        handler = type('RequestHandler', (RequestHandler,), {'timeout': keepalive})
+        super().__init__(host, port, Middleware(self, app, compress), handler=handler)
+        self._workers = workers
+        self._max_streams = max_streams
+        self._pending = queue.Queue(maxsize=backlog)
+        self._lock = threading.Lock()
+        self._threads = 0
+        self._stats = {
+            'requests': 0,
+            'rejected': 0,
+            'active': 0,
+            'active_max': 0,
+            'streams': 0,
+            'latency_tot': 0.0,
+            'latency_max': 0.0,
+        }
+        for _ in range(workers):
+            self._spawn()
+
+    def _spawn(self):
+        self._threads += 1
+        threading.Thread(target=self._work, daemon=True).start()
+
+    def _work(self):
+        while True:
+            request, client_address = self._pending.get()
+            try:
+                self.finish_request(request, client_address)
+            except Exception:
+                self.handle_error(request, client_address)
+            finally:
+                self.shutdown_request(request)
+
+            with self._lock:
+                # a replacement was started while we were busy with a stream
+                if self._threads > self._workers:
+                    self._threads -= 1
+                    return
+
+    def process_request(self, request, client_address):
+        try:
+            self._pending.put_nowait((request, client_address))
+        except queue.Full:
+            with self._lock:
+                self._stats['rejected'] += 1
+            self.shutdown_request(request)
+
+    def detach(self):
+        """
+        Called by a worker that is about to serve a long lived response, a new worker
+        takes its place in the pool unless there are too many streams already
+        """
+        with self._lock:
+            if self._stats['streams'] >= self._max_streams:
+                return False
+            self._stats['streams'] += 1
+            self._spawn()
+            return True
+
+    def attach(self):
+        with self._lock:
+            self._stats['streams'] -= 1
+
+    def enter(self):
+        with self._lock:
+            self._stats['active'] += 1
+            self._stats['active_max'] = max(self._stats['active_max'], self._stats['active'])
+
+    def track(self, latency):
+        with self._lock:
+            self._stats['active'] -= 1
+            self._stats['requests'] += 1
+            self._stats['latency_tot'] += latency
+            self._stats['latency_max'] = max(self._stats['latency_max'], latency)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['workers'] = self._workers
+            stats['threads'] = self._threads
+        stats['pending'] = self._pending.qsize()
+        stats['latency_avg'] = stats['latency_tot'] / stats['requests'] if stats['requests'] else 0.0
+        return stats
+
+
+def serve(app, config):
+    global server
+
+    started = time.time()
+    server = PooledWSGIServer(config['address'], config['port'], app,
+                              workers=config['workers'],
+                              max_streams=config['max_streams'],
+                              backlog=config['backlog'],
+                              keepalive=config['keepalive'],
+                              compress=config['gzip'])
+    logging.debug("web server with %d workers started in %.3fs" % (config['workers'], time.time() - started))
+    server.serve_forever()
+
+
+def stats():
+    return server.stats() if server is not None else {}
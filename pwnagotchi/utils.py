@@ -290,6 +290,9 @@ def load_config(args):
     elif config['ui']['display']['type'] in ('spotpear24inch'):
         config['ui']['display']['type'] = 'spotpear24inch'
 
+    elif config['ui']['display']['type'] in ('virtual', 'headless'):
+        config['ui']['display']['type'] = 'virtual'
+
     else:
         print("unsupported display type %s" % config['ui']['display']['type'])
         sys.exit(1)
@@ -304,8 +307,8 @@ def secs_to_hhmmss(secs):
 
 
 def total_unique_handshakes(path):
-    expr = os.path.join(path, "*.pcap")
-    return len(glob.glob(expr))
+    from pwnagotchi.handshakes import store_for
+    return store_for(path).count()
 
 
 def iface_channels(ifname):
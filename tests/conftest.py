@@ -0,0 +1,5 @@
+import os
+import sys
+
+# spidev and RPi.GPIO are replaced by the recording fakes, so that the display drivers can run anywhere
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'fakes'))
@@ -0,0 +1,817 @@
+"""
+The waveshare drivers as they were before they sent whole buffers: each class overrides
+the methods that changed with their old per-byte code, everything else is the driver's own.
+"""
+import importlib
+import os
+from unittest import mock
+
+from PIL import Image
+
+GPIOMEM = '/sys/bus/platform/drivers/gpiomem-bcm2835'
+
+
+def load(name):
+    # the epdconfig modules only pick the Raspberry Pi backend if they find its gpio driver
+    exists = os.path.exists
+    with mock.patch('os.path.exists', lambda path: path == GPIOMEM or exists(path)):
+        return importlib.import_module('pwnagotchi.ui.hw.libs.waveshare.%s' % name)
+
+
+v1 = load('v1.epd2in13')
+v1bc = load('v1.epd2in13bc')
+v1bcfast = load('v1.epd2in13bcFAST')
+v154b = load('v154inch.epd1in54b')
+v2 = load('v2.waveshare')
+v213bc = load('v213bc.epd2in13bc')
+v213d = load('v213d.epd2in13d')
+v27 = load('v27inch.epd2in7')
+v29 = load('v29inch.epd2in9')
+v3 = load('v3.epd2in13_V3')
+
+
+class V1(v1.EPD):
+    def init(self, lut):
+        if (v1.epdconfig.module_init() != 0):
+            return -1
+        # EPD hardware init start
+        self.reset()
+        self.send_command(0x01) # DRIVER_OUTPUT_CONTROL
+        self.send_data((v1.EPD_HEIGHT - 1) & 0xFF)
+        self.send_data(((v1.EPD_HEIGHT - 1) >> 8) & 0xFF)
+        self.send_data(0x00) # GD = 0 SM = 0 TB = 0
+
+        self.send_command(0x0C) # BOOSTER_SOFT_START_CONTROL
+        self.send_data(0xD7)
+        self.send_data(0xD6)
+        self.send_data(0x9D)
+
+        self.send_command(0x2C) # WRITE_VCOM_REGISTER
+        self.send_data(0xA8) # VCOM 7C
+
+        self.send_command(0x3A) # SET_DUMMY_LINE_PERIOD
+        self.send_data(0x1A) # 4 dummy lines per gate
+
+        self.send_command(0x3B) # SET_GATE_TIME
+        self.send_data(0x08) # 2us per line
+
+        self.send_command(0X3C) # BORDER_WAVEFORM_CONTROL
+        self.send_data(0x03)
+
+        self.send_command(0X11) # DATA_ENTRY_MODE_SETTING
+        self.send_data(0x03) # X increment; Y increment
+
+        # WRITE_LUT_REGISTER
+        self.send_command(0x32)
+        for count in range(30):
+            self.send_data(lut[count])
+
+        return 0
+
+    def display(self, image):
+        if self.width%8 == 0:
+            linewidth = int(self.width/8)
+        else:
+            linewidth = int(self.width/8) + 1
+
+        self.SetWindows(0, 0, self.width, self.height);
+        for j in range(0, self.height):
+            self.SetCursor(0, j);
+            self.send_command(0x24);
+            for i in range(0, linewidth):
+                self.send_data(image[i + j * linewidth])
+        self.TurnOnDisplay()
+
+    def Clear(self, color):
+        if self.width%8 == 0:
+            linewidth = int(self.width/8)
+        else:
+            linewidth = int(self.width/8) + 1
+
+        self.SetWindows(0, 0, self.width, self.height);
+        for j in range(0, self.height):
+            self.SetCursor(0, j);
+            self.send_command(0x24);
+            for i in range(0, linewidth):
+                self.send_data(color)
+        self.TurnOnDisplay()
+
+
+class V1bc(v1bc.EPD):
+    def displayBlack(self, imageblack):
+        self.send_command(0x10)
+        for i in range(0, int(self.width * self.height / 8)):
+            self.send_data(imageblack[i])
+        self.send_command(0x92)
+
+        self.send_command(0x12) # REFRESH
+        self.ReadBusy()
+
+    def display(self, imageblack, imagecolor):
+        self.send_command(0x10)
+        for i in range(0, int(self.width * self.height / 8)):
+            self.send_data(imageblack[i])
+        self.send_command(0x92)
+
+        self.send_command(0x13)
+        for i in range(0, int(self.width * self.height / 8)):
+            self.send_data(imagecolor[i])
+        self.send_command(0x92)
+
+        self.send_command(0x12) # REFRESH
+        self.ReadBusy()
+
+    def Clear(self):
+        self.send_command(0x10)
+        for i in range(0, int(self.width * self.height / 8)):
+            self.send_data(0xFF)
+        self.send_command(0x92)
+
+        self.send_command(0x13)
+        for i in range(0, int(self.width * self.height / 8)):
+            self.send_data(0xFF)
+        self.send_command(0x92)
+
+        self.send_command(0x12) # REFRESH
+        self.ReadBusy()
+
+
+class V1bcFast(v1bcfast.EPD):
+    def SetPartReg(self):
+        self.send_command(0x82)
+        self.send_data(0x03)
+        self.send_command(0X50)
+        self.send_data(0x47)
+
+        self.send_command(0x20) # vcom
+        for count in range(0, 44):
+            self.send_data(self.lut_vcom1[count])
+        self.send_command(0x21) # ww --
+        for count in range(0, 42):
+            self.send_data(self.lut_ww1[count])
+        self.send_command(0x22) # bw r
+        for count in range(0, 42):
+            self.send_data(self.lut_bw1[count])
+        self.send_command(0x23) # wb w
+        for count in range(0, 42):
+            self.send_data(self.lut_wb1[count])
+        self.send_command(0x24) # bb b
+        for count in range(0, 42):
+            self.send_data(self.lut_bb1[count])
+
+    def display(self, image):
+        if (Image == None):
+            return
+
+        self.send_command(0x10)
+        for i in range(0, int(self.width * self.height / 8)):
+            self.send_data(0x00)
+        v1bcfast.epdconfig.delay_ms(10)
+
+        self.send_command(0x13)
+        for i in range(0, int(self.width * self.height / 8)):
+            self.send_data(image[i])
+        v1bcfast.epdconfig.delay_ms(10)
+
+        self.SetFullReg()
+        self.TurnOnDisplay()
+
+    def DisplayPartial(self, image):
+        if (Image == None):
+            return
+
+        self.SetPartReg()
+        self.send_command(0x91)
+        self.send_command(0x90)
+        self.send_data(0)
+        self.send_data(self.width - 1)
+
+        self.send_data(0)
+        self.send_data(0)
+        self.send_data(int(self.height / 256))
+        self.send_data(self.height % 256 - 1)
+        self.send_data(0x28)
+
+        self.send_command(0x10)
+        for i in range(0, int(self.width * self.height / 8)):
+            self.send_data(image[i])
+        v1bcfast.epdconfig.delay_ms(10)
+
+        self.send_command(0x13)
+        for i in range(0, int(self.width * self.height / 8)):
+            self.send_data(~image[i])
+        v1bcfast.epdconfig.delay_ms(10)
+
+        self.TurnOnDisplay()
+
+    def Clear(self):
+        self.send_command(0x10)
+        for i in range(0, int(self.width * self.height / 8)):
+            self.send_data(0x00)
+        v1bcfast.epdconfig.delay_ms(10)
+
+        self.send_command(0x13)
+        for i in range(0, int(self.width * self.height / 8)):
+            self.send_data(0x00)
+        v1bcfast.epdconfig.delay_ms(10)
+
+        self.SetFullReg()
+        self.TurnOnDisplay()
+
+
+class V154b(v154b.EPD):
+    def set_lut_bw(self):
+        self.send_command(0x20) # vcom
+        for count in range(0, 15):
+            self.send_data(self.lut_vcom0[count])
+        self.send_command(0x21) # ww --
+        for count in range(0, 15):
+            self.send_data(self.lut_w[count])
+        self.send_command(0x22) # bw r
+        for count in range(0, 15):
+            self.send_data(self.lut_b[count])
+        self.send_command(0x23) # wb w
+        for count in range(0, 15):
+            self.send_data(self.lut_g1[count])
+        self.send_command(0x24) # bb b
+        for count in range(0, 15):
+            self.send_data(self.lut_g2[count])
+
+    def set_lut_red(self):
+        self.send_command(0x25)
+        for count in range(0, 15):
+            self.send_data(self.lut_vcom1[count])
+        self.send_command(0x26)
+        for count in range(0, 15):
+            self.send_data(self.lut_red0[count])
+        self.send_command(0x27)
+        for count in range(0, 15):
+            self.send_data(self.lut_red1[count])
+
+    def display(self, blackimage, redimage):
+        # send black data
+        if (blackimage != None):
+            self.send_command(0x10) # DATA_START_TRANSMISSION_1
+            for i in range(0, int(self.width * self.height / 8)):
+                temp = 0x00
+                for bit in range(0, 4):
+                    if (blackimage[i] & (0x80 >> bit) != 0):
+                        temp |= 0xC0 >> (bit * 2)
+                self.send_data(temp)
+                temp = 0x00
+                for bit in range(4, 8):
+                    if (blackimage[i] & (0x80 >> bit) != 0):
+                        temp |= 0xC0 >> ((bit - 4) * 2)
+                self.send_data(temp)
+
+        # send red data
+        if (redimage != None):
+            self.send_command(0x13) # DATA_START_TRANSMISSION_2
+            for i in range(0, int(self.width * self.height / 8)):
+                self.send_data(redimage[i])
+
+        self.send_command(0x12) # DISPLAY_REFRESH
+        self.ReadBusy()
+
+    def Clear(self):
+        self.send_command(0x10) # DATA_START_TRANSMISSION_1
+        for i in range(0, int(self.width * self.height / 8)):
+            self.send_data(0xFF)
+            self.send_data(0xFF)
+
+        self.send_command(0x13) # DATA_START_TRANSMISSION_2
+        for i in range(0, int(self.width * self.height / 8)):
+            self.send_data(0xFF)
+
+        self.send_command(0x12) # DISPLAY_REFRESH
+        self.ReadBusy()
+
+
+class V2(v2.EPD):
+    def init(self, update):
+        if (v2.module_init() != 0):
+            return -1
+        # EPD hardware init start
+        self.reset()
+        if (update == self.FULL_UPDATE):
+            self.wait_until_idle()
+            self.send_command(0x12)  # soft reset
+            self.wait_until_idle()
+
+            self.send_command(0x74)  # set analog block control
+            self.send_data(0x54)
+            self.send_command(0x7E)  # set digital block control
+            self.send_data(0x3B)
+
+            self.send_command(0x01)  # Driver output control
+            self.send_data(0xF9)
+            self.send_data(0x00)
+            self.send_data(0x00)
+
+            self.send_command(0x11)  # data entry mode
+            self.send_data(0x01)
+
+            self.send_command(0x44)  # set Ram-X address start//end position
+            self.send_data(0x00)
+            self.send_data(0x0F)  # 0x0C-->(15+1)*8=128
+
+            self.send_command(0x45)  # set Ram-Y address start//end position
+            self.send_data(0xF9)  # 0xF9-->(249+1)=250
+            self.send_data(0x00)
+            self.send_data(0x00)
+            self.send_data(0x00)
+
+            self.send_command(0x3C)  # BorderWavefrom
+            self.send_data(0x03)
+
+            self.send_command(0x2C)  # VCOM Voltage
+            self.send_data(0x55)  #
+
+            self.send_command(0x03)
+            self.send_data(self.lut_full_update[70])
+
+            self.send_command(0x04)  #
+            self.send_data(self.lut_full_update[71])
+            self.send_data(self.lut_full_update[72])
+            self.send_data(self.lut_full_update[73])
+
+            self.send_command(0x3A)  # Dummy Line
+            self.send_data(self.lut_full_update[74])
+            self.send_command(0x3B)  # Gate time
+            self.send_data(self.lut_full_update[75])
+
+            self.send_command(0x32)
+            for count in range(70):
+                self.send_data(self.lut_full_update[count])
+
+            self.send_command(0x4E)  # set RAM x address count to 0
+            self.send_data(0x00)
+            self.send_command(0x4F)  # set RAM y address count to 0X127
+            self.send_data(0xF9)
+            self.send_data(0x00)
+            self.wait_until_idle()
+        else:
+            self.send_command(0x2C)  # VCOM Voltage
+            self.send_data(0x26)
+
+            self.wait_until_idle()
+
+            self.send_command(0x32)
+            for count in range(70):
+                self.send_data(self.lut_partial_update[count])
+
+            self.send_command(0x37)
+            self.send_data(0x00)
+            self.send_data(0x00)
+            self.send_data(0x00)
+            self.send_data(0x00)
+            self.send_data(0x40)
+            self.send_data(0x00)
+            self.send_data(0x00)
+
+            self.send_command(0x22)
+            self.send_data(0xC0)
+            self.send_command(0x20)
+            self.wait_until_idle()
+
+            self.send_command(0x3C)  # BorderWavefrom
+            self.send_data(0x01)
+        return 0
+
+    def display(self, image):
+        if self.width % 8 == 0:
+            linewidth = self.width // 8
+        else:
+            linewidth = self.width // 8 + 1
+
+        self.send_command(0x24)
+        for j in range(0, self.height):
+            for i in range(0, linewidth):
+                self.send_data(image[i + j * linewidth])
+        self.TurnOnDisplay()
+
+    def displayPartial(self, image):
+        if self.width % 8 == 0:
+            linewidth = self.width // 8
+        else:
+            linewidth = self.width // 8 + 1
+
+        self.send_command(0x24)
+        for j in range(0, self.height):
+            for i in range(0, linewidth):
+                self.send_data(image[i + j * linewidth])
+        self.send_command(0x26)
+        for j in range(0, self.height):
+            for i in range(0, linewidth):
+                self.send_data(~image[i + j * linewidth])
+        self.TurnOnDisplay()
+
+    def Clear(self, color):
+        if self.width % 8 == 0:
+            linewidth = self.width // 8
+        else:
+            linewidth = self.width // 8 + 1
+
+        self.send_command(0x24)
+        for j in range(0, self.height):
+            for i in range(0, linewidth):
+                self.send_data(color)
+        self.TurnOnDisplay()
+
+
+class V213bc(v213bc.EPD):
+    def SetFullReg(self):
+        self.send_command(0x82)
+        self.send_data(0x00)
+        self.send_command(0X50)
+        self.send_data(0x97)
+
+        self.send_command(0x20) # vcom
+        for count in range(0, 44):
+            self.send_data(self.lut_vcomDC[count])
+        self.send_command(0x21) # ww --
+        for count in range(0, 42):
+            self.send_data(self.lut_ww[count])
+        self.send_command(0x22) # bw r
+        for count in range(0, 42):
+            self.send_data(self.lut_bw[count])
+        self.send_command(0x23) # wb w
+        for count in range(0, 42):
+            self.send_data(self.lut_wb[count])
+        self.send_command(0x24) # bb b
+        for count in range(0, 42):
+            self.send_data(self.lut_bb[count])
+
+    def display(self, imageblack, imagered):
+        self.send_command(0x10)
+        for i in range(0, int(self.width * self.height / 8)):
+            self.send_data(imageblack[i])
+        self.send_command(0x92)
+
+        self.send_command(0x13)
+        for i in range(0, int(self.width * self.height / 8)):
+            self.send_data(imagered[i])
+        self.send_command(0x92)
+
+        self.send_command(0x12) # REFRESH
+        self.ReadBusy()
+
+    def pwndisplay(self, imageblack):
+        if (Image == None):
+            return
+
+        self.send_command(0x10)
+        for i in range(0, int(self.width * self.height / 8)):
+            self.send_data(0x00)
+        v213bc.epdconfig.delay_ms(10)
+
+        self.send_command(0x13)
+        for i in range(0, int(self.width * self.height / 8)):
+            self.send_data(imageblack[i])
+        v213bc.epdconfig.delay_ms(10)
+
+        self.SetFullReg()
+        self.TurnOnDisplay()
+
+    def Clear(self):
+        self.send_command(0x10)
+        for i in range(0, int(self.width * self.height / 8)):
+            self.send_data(0xFF)
+        self.send_command(0x92)
+
+        self.send_command(0x13)
+        for i in range(0, int(self.width * self.height / 8)):
+            self.send_data(0xFF)
+        self.send_command(0x92)
+
+        self.send_command(0x12) # REFRESH
+        self.ReadBusy()
+
+    def pwnclear(self):
+        self.send_command(0x10)
+        for i in range(0, int(self.width * self.height / 8)):
+            self.send_data(0xFF)
+        v213bc.epdconfig.delay_ms(10)
+
+        self.send_command(0x13)
+        for i in range(0, int(self.width * self.height / 8)):
+            self.send_data(0xFF)
+        v213bc.epdconfig.delay_ms(10)
+
+        self.SetFullReg()
+        self.TurnOnDisplay()
+
+
+class V213d(v213d.EPD):
+    def SetFullReg(self):
+        self.send_command(0x82)
+        self.send_data(0x00)
+        self.send_command(0X50)
+        self.send_data(0x97)
+
+        self.send_command(0x20) # vcom
+        for count in range(0, 44):
+            self.send_data(self.lut_vcomDC[count])
+        self.send_command(0x21) # ww --
+        for count in range(0, 42):
+            self.send_data(self.lut_ww[count])
+        self.send_command(0x22) # bw r
+        for count in range(0, 42):
+            self.send_data(self.lut_bw[count])
+        self.send_command(0x23) # wb w
+        for count in range(0, 42):
+            self.send_data(self.lut_wb[count])
+        self.send_command(0x24) # bb b
+        for count in range(0, 42):
+            self.send_data(self.lut_bb[count])
+
+    def SetPartReg(self):
+        self.send_command(0x82)
+        self.send_data(0x03)
+        self.send_command(0X50)
+        self.send_data(0x47)
+
+        self.send_command(0x20) # vcom
+        for count in range(0, 44):
+            self.send_data(self.lut_vcom1[count])
+        self.send_command(0x21) # ww --
+        for count in range(0, 42):
+            self.send_data(self.lut_ww1[count])
+        self.send_command(0x22) # bw r
+        for count in range(0, 42):
+            self.send_data(self.lut_bw1[count])
+        self.send_command(0x23) # wb w
+        for count in range(0, 42):
+            self.send_data(self.lut_wb1[count])
+        self.send_command(0x24) # bb b
+        for count in range(0, 42):
+            self.send_data(self.lut_bb1[count])
+
+    def display(self, image):
+        if (Image == None):
+            return
+
+        self.send_command(0x10)
+        for i in range(0, int(self.width * self.height / 8)):
+            self.send_data(0x00)
+        v213d.epdconfig.delay_ms(10)
+
+        self.send_command(0x13)
+        for i in range(0, int(self.width * self.height / 8)):
+            self.send_data(image[i])
+        v213d.epdconfig.delay_ms(10)
+
+        self.SetFullReg()
+        self.TurnOnDisplay()
+
+    def DisplayPartial(self, image):
+        if (Image == None):
+            return
+
+        self.SetPartReg()
+        self.send_command(0x91)
+        self.send_command(0x90)
+        self.send_data(0)
+        self.send_data(self.width - 1)
+
+        self.send_data(0)
+        self.send_data(0)
+        self.send_data(int(self.height / 256))
+        self.send_data(self.height % 256 - 1)
+        self.send_data(0x28)
+
+        self.send_command(0x10)
+        for i in range(0, int(self.width * self.height / 8)):
+            self.send_data(image[i])
+        v213d.epdconfig.delay_ms(10)
+
+        self.send_command(0x13)
+        for i in range(0, int(self.width * self.height / 8)):
+            self.send_data(~image[i])
+        v213d.epdconfig.delay_ms(10)
+
+        self.TurnOnDisplay()
+
+    def Clear(self):
+        self.send_command(0x10)
+        for i in range(0, int(self.width * self.height / 8)):
+            self.send_data(0x00)
+        v213d.epdconfig.delay_ms(10)
+
+        self.send_command(0x13)
+        for i in range(0, int(self.width * self.height / 8)):
+            self.send_data(0xFF)
+        v213d.epdconfig.delay_ms(10)
+
+        self.SetFullReg()
+        self.TurnOnDisplay()
+
+
+class V27(v27.EPD):
+    def set_lut(self):
+        self.send_command(0x20) # vcom
+        for count in range(0, 44):
+            self.send_data(self.lut_vcom_dc[count])
+        self.send_command(0x21) # ww --
+        for count in range(0, 42):
+            self.send_data(self.lut_ww[count])
+        self.send_command(0x22) # bw r
+        for count in range(0, 42):
+            self.send_data(self.lut_bw[count])
+        self.send_command(0x23) # wb w
+        for count in range(0, 42):
+            self.send_data(self.lut_bb[count])
+        self.send_command(0x24) # bb b
+        for count in range(0, 42):
+            self.send_data(self.lut_wb[count])
+
+    def gray_SetLut(self):
+        self.send_command(0x20)
+        for count in range(0, 44):        #vcom
+            self.send_data(self.gray_lut_vcom[count])
+
+        self.send_command(0x21)                         #red not use
+        for count in range(0, 42):
+            self.send_data(self.gray_lut_ww[count])
+
+        self.send_command(0x22)                         #bw r
+        for count in range(0, 42):
+            self.send_data(self.gray_lut_bw[count])
+
+        self.send_command(0x23)                         #wb w
+        for count in range(0, 42):
+            self.send_data(self.gray_lut_wb[count])
+
+        self.send_command(0x24)                         #bb b
+        for count in range(0, 42):
+            self.send_data(self.gray_lut_bb[count])
+
+        self.send_command(0x25)                         #vcom
+        for count in range(0, 42):
+            self.send_data(self.gray_lut_ww[count])
+
+    def display(self, image):
+        self.send_command(0x10)
+        for i in range(0, int(self.width * self.height / 8)):
+            self.send_data(0xFF)
+        self.send_command(0x13)
+        for i in range(0, int(self.width * self.height / 8)):
+            self.send_data(image[i])
+        self.send_command(0x12)
+        self.ReadBusy()
+
+    def Clear(self, color):
+        self.send_command(0x10)
+        for i in range(0, int(self.width * self.height / 8)):
+            self.send_data(0xFF)
+        self.send_command(0x13)
+        for i in range(0, int(self.width * self.height / 8)):
+            self.send_data(0xFF)
+        self.send_command(0x12)
+        self.ReadBusy()
+
+
+class V29(v29.EPD):
+    def init(self, lut):
+        if (v29.epdconfig.module_init() != 0):
+            return -1
+        # EPD hardware init start
+        self.reset()
+
+        self.send_command(0x01) # DRIVER_OUTPUT_CONTROL
+        self.send_data((v29.EPD_HEIGHT - 1) & 0xFF)
+        self.send_data(((v29.EPD_HEIGHT - 1) >> 8) & 0xFF)
+        self.send_data(0x00) # GD = 0 SM = 0 TB = 0
+
+        self.send_command(0x0C) # BOOSTER_SOFT_START_CONTROL
+        self.send_data(0xD7)
+        self.send_data(0xD6)
+        self.send_data(0x9D)
+
+        self.send_command(0x2C) # WRITE_VCOM_REGISTER
+        self.send_data(0xA8) # VCOM 7C
+
+        self.send_command(0x3A) # SET_DUMMY_LINE_PERIOD
+        self.send_data(0x1A) # 4 dummy lines per gate
+
+        self.send_command(0x3B) # SET_GATE_TIME
+        self.send_data(0x08) # 2us per line
+
+        self.send_command(0x11) # DATA_ENTRY_MODE_SETTING
+        self.send_data(0x03) # X increment Y increment
+
+        self.send_command(0x32) # WRITE_LUT_REGISTER
+        for i in range(0, len(lut)):
+            self.send_data(lut[i])
+        # EPD hardware init end
+        return 0
+
+    def display(self, image):
+        if (image == None):
+            return
+        self.SetWindow(0, 0, self.width - 1, self.height - 1)
+        for j in range(0, self.height):
+            self.SetCursor(0, j)
+            self.send_command(0x24) # WRITE_RAM
+            for i in range(0, int(self.width / 8)):
+                self.send_data(image[i + j * int(self.width / 8)])
+        self.TurnOnDisplay()
+
+    def Clear(self, color):
+        self.SetWindow(0, 0, self.width - 1, self.height - 1)
+        for j in range(0, self.height):
+            self.SetCursor(0, j)
+            self.send_command(0x24) # WRITE_RAM
+            for i in range(0, int(self.width / 8)):
+                self.send_data(color)
+        self.TurnOnDisplay()
+
+
+class V3(v3.EPD):
+    def Lut(self, lut):
+        self.send_command(0x32)
+        for i in range(0, 153):
+            self.send_data(lut[i])
+        self.ReadBusy()
+
+    def display(self, image):
+        if self.width%8 == 0:
+            linewidth = int(self.width/8)
+        else:
+            linewidth = int(self.width/8) + 1
+
+        self.send_command(0x24)
+        for j in range(0, self.height):
+            for i in range(0, linewidth):
+                self.send_data(image[i + j * linewidth])
+        self.TurnOnDisplay()
+
+    def displayPartial(self, image):
+        if self.width%8 == 0:
+            linewidth = int(self.width/8)
+        else:
+            linewidth = int(self.width/8) + 1
+
+        v3.epdconfig.digital_write(self.reset_pin, 0)
+        v3.epdconfig.delay_ms(1)
+        v3.epdconfig.digital_write(self.reset_pin, 1)
+
+        self.SetLut(self.lut_partial_update)
+        self.send_command(0x37)
+        self.send_data(0x00)
+        self.send_data(0x00)
+        self.send_data(0x00)
+        self.send_data(0x00)
+        self.send_data(0x00)
+        self.send_data(0x40)
+        self.send_data(0x00)
+        self.send_data(0x00)
+        self.send_data(0x00)
+        self.send_data(0x00)
+
+        self.send_command(0x3C) #BorderWavefrom
+        self.send_data(0x80)
+
+        self.send_command(0x22)
+        self.send_data(0xC0)
+        self.send_command(0x20)
+        self.ReadBusy()
+
+        self.SetWindow(0, 0, self.width - 1, self.height - 1)
+        self.SetCursor(0, 0)
+
+        self.send_command(0x24) # WRITE_RAM
+        for j in range(0, self.height):
+            for i in range(0, linewidth):
+                self.send_data(image[i + j * linewidth])
+        self.TurnOnDisplayPart()
+
+    def displayPartBaseImage(self, image):
+        if self.width%8 == 0:
+            linewidth = int(self.width/8)
+        else:
+            linewidth = int(self.width/8) + 1
+
+        self.send_command(0x24)
+        for j in range(0, self.height):
+            for i in range(0, linewidth):
+                self.send_data(image[i + j * linewidth])
+
+        self.send_command(0x26)
+        for j in range(0, self.height):
+            for i in range(0, linewidth):
+                self.send_data(image[i + j * linewidth])
+        self.TurnOnDisplay()
+
+    def Clear(self, color):
+        if self.width%8 == 0:
+            linewidth = int(self.width/8)
+        else:
+            linewidth = int(self.width/8) + 1
+
+        self.send_command(0x24)
+        for j in range(0, self.height):
+            for i in range(0, linewidth):
+                self.send_data(color)
+
+        self.TurnOnDisplay()
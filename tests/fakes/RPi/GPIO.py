@@ -0,0 +1,37 @@
+"""
+Stands in for RPi.GPIO in the tests: it keeps the level of the output pins, so that the
+fake spidev can tell commands from data, and input() returns what the test put in inputs.
+"""
+BCM = 11
+BOARD = 10
+OUT = 0
+IN = 1
+LOW = 0
+HIGH = 1
+
+pins = {}
+inputs = {}
+
+
+def setmode(mode):
+    pass
+
+
+def setwarnings(flag):
+    pass
+
+
+def setup(pin, direction, **kwargs):
+    pass
+
+
+def output(pin, value):
+    pins[pin] = HIGH if value else LOW
+
+
+def input(pin):
+    return inputs.get(pin, LOW)
+
+
+def cleanup(*args):
+    pins.clear()
@@ -0,0 +1,47 @@
+"""
+Stands in for spidev in the tests. Every byte written goes to bus with the level the DC
+pin had at the time (0 for a command, 1 for data), and calls counts the transfers.
+"""
+from RPi import GPIO
+
+# the e-paper drivers all use BCM 25 for DC
+DC_PIN = 25
+
+bus = []
+calls = {'writebytes': 0, 'writebytes2': 0}
+
+
+def reset():
+    del bus[:]
+    calls['writebytes'] = 0
+    calls['writebytes2'] = 0
+    GPIO.pins.clear()
+    GPIO.inputs.clear()
+
+
+def _record(data):
+    dc = GPIO.pins.get(DC_PIN)
+    # the real module keeps the low 8 bits of every value, ~byte included
+    bus.extend((dc, int(b) & 0xFF) for b in data)
+
+
+class SpiDev(object):
+    def __init__(self, bus=None, device=None):
+        self.max_speed_hz = 0
+        self.mode = 0
+
+    def open(self, bus, device):
+        pass
+
+    def close(self):
+        pass
+
+    def writebytes(self, data):
+        if len(data) > 4096:
+            raise OverflowError("Argument list size exceeds 4096 bytes.")
+        calls['writebytes'] += 1
+        _record(data)
+
+    def writebytes2(self, data):
+        calls['writebytes2'] += 1
+        _record(data)
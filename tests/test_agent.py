@@ -0,0 +1,66 @@
+from pwnagotchi.agent import Agent
+from pwnagotchi.mesh import wifi
+
+
+def ap(mac, channel, clients=(), encryption='WPA2'):
+    return {'mac': mac, 'hostname': mac, 'channel': channel, 'encryption': encryption,
+            'clients': [{'mac': sta} for sta in clients]}
+
+
+class Epoch(object):
+    def __init__(self):
+        self.observed = []
+
+    def observe(self, aps, peers):
+        self.observed.append(aps)
+
+
+def agent(snapshots):
+    """
+    Just enough of an agent for the access points bookkeeping, the session snapshots
+    come from the list instead of bettercap
+    """
+    a = Agent.__new__(Agent)
+    a._config = {'main': {'whitelist': []}, 'personality': {'channels': []}}
+    a._filter = None
+    a._peers = {}
+    a._epoch = Epoch()
+    a._filtered_version = None
+    a._filtered_aps = []
+    a._filtered_table = wifi.AccessPointTable()
+    a.session_snapshot = lambda: snapshots.pop(0)
+    return a
+
+
+def test_table_is_built_once_per_snapshot(monkeypatch):
+    built = []
+
+    class Table(wifi.AccessPointTable):
+        def __init__(self, aps=()):
+            built.append(list(aps))
+            super().__init__(aps)
+
+    monkeypatch.setattr('pwnagotchi.agent.AccessPointTable', Table)
+
+    first = {'wifi': {'aps': [ap('aa:aa:aa:aa:aa:aa', 6, ['11:11:11:11:11:11']), ap('bb:bb:bb:bb:bb:bb', 1),
+                              ap('cc:cc:cc:cc:cc:cc', 1, encryption='OPEN')]}}
+    second = {'wifi': {'aps': [ap('dd:dd:dd:dd:dd:dd', 11)]}}
+    a = agent([(1, first), (1, first), (None, first), (2, second)])
+
+    assert [x['mac'] for x in a.get_access_points()] == ['bb:bb:bb:bb:bb:bb', 'aa:aa:aa:aa:aa:aa']
+    table = a.get_access_points_table()
+    assert table.station('AA:AA:AA:AA:AA:AA', '11:11:11:11:11:11') is not None
+
+    # same version, same table
+    a.get_access_points()
+    assert a.get_access_points_table() is table
+    assert len(built) == 1
+
+    # snapshots without a version can't be cached
+    a.get_access_points()
+    assert a.get_access_points_table() is not table
+    assert len(built) == 2
+
+    assert [x['mac'] for x in a.get_access_points()] == ['dd:dd:dd:dd:dd:dd']
+    assert len(built) == 3
+    assert a._epoch.observed[-1] is a.get_access_points_table()
@@ -0,0 +1,129 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from pwnagotchi.bettercap import Client, AsyncClient, pipeline
+
+# how long the fake api takes to run a command
+DELAY = 0.2
+
+
+class API(BaseHTTPRequestHandler):
+    """
+    Just enough of the bettercap rest api: GET /api/session returns server.session, POST runs
+    the command after DELAY seconds and fails for unknown BSSIDs like bettercap does.
+    """
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, code, body):
+        data = body.encode()
+        self.send_response(code)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        self.server.gets += 1
+        self._reply(200, self.server.session)
+
+    def do_POST(self):
+        cmd = json.loads(self.rfile.read(int(self.headers['Content-Length'])))['cmd']
+        time.sleep(DELAY)
+        self.server.commands.append(cmd)
+        if 'ff:ff:ff:ff:ff:ff' in cmd:
+            self._reply(400, 'ff:ff:ff:ff:ff:ff is an unknown BSSID or it is in the association skip list.')
+        else:
+            self._reply(200, '{"success": true, "msg": "%s"}' % cmd)
+
+
+@pytest.fixture
+def api():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), API)
+    server.daemon_threads = True
+    server.session = '{"wifi": {"aps": []}}'
+    server.gets = 0
+    server.commands = []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def client(api):
+    return Client('127.0.0.1', port=api.server_address[1], retries=0, session_ttl=60.0)
+
+
+def test_pipeline():
+    assert pipeline(['wifi.recon off;', ' ', 'wifi.recon on']) == 'wifi.recon off; wifi.recon on'
+
+
+def test_async_run_all_is_concurrent(api, client):
+    commands = ['wifi.assoc aa:bb:cc:dd:ee:ff', 'wifi.deauth 11:22:33:44:55:66',
+                'wifi.deauth ff:ff:ff:ff:ff:ff', 'wifi.deauth 66:55:44:33:22:11']
+    async_client = AsyncClient(client)
+
+    started = time.time()
+    results = asyncio.run(async_client.run_all(commands))
+    elapsed = time.time() - started
+    async_client.close()
+
+    assert elapsed < DELAY * len(commands) / 2
+    assert sorted(api.commands) == sorted(commands)
+    assert [r['msg'] for r in results if not isinstance(r, Exception)] == [commands[0], commands[1], commands[3]]
+    assert 'is an unknown BSSID' in str(results[2])
+
+
+def test_async_session_and_run_many(api, client):
+    async_client = AsyncClient(client)
+
+    async def go():
+        return await async_client.session(), await async_client.run_many(['wifi.recon off', 'wifi.recon on'])
+
+    session, result = asyncio.run(go())
+    async_client.close()
+
+    assert session == {'wifi': {'aps': []}}
+    assert api.commands == ['wifi.recon off; wifi.recon on']
+    assert result['success']
+
+
+def test_session_is_shared(api, client):
+    first, second = client.session_snapshot(), client.session_snapshot()
+    assert first[0] is not None
+    assert first == second
+    assert api.gets == 1
+
+
+def test_invalid_session_is_not_cached(api, client):
+    api.session = 'not json'
+    assert client.session_snapshot() == (None, 'not json')
+
+    api.session = '{"wifi": {"aps": [1]}}'
+    version, s = client.session_snapshot()
+    assert version is not None
+    assert s == {'wifi': {'aps': [1]}}
+    assert api.gets == 2
+
+
+def test_invalidated_fetch_has_no_version(api, client):
+    version, _ = client.session_snapshot()
+
+    request = client._request
+
+    def invalidated(method, path, **kwargs):
+        r = request(method, path, **kwargs)
+        client.invalidate_session()
+        return r
+
+    api.session = '{"wifi": {"aps": [2]}}'
+    client._request = invalidated
+    client.invalidate_session()
+    assert client.session_snapshot() == (None, {'wifi': {'aps': [2]}})
+    assert client.session_version() == version
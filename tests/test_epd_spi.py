@@ -0,0 +1,183 @@
+import random
+import time
+
+import pytest
+import spidev
+from RPi import GPIO
+
+import epd_reference as ref
+from pwnagotchi.ui.hw.libs import packing
+
+BUSY_PIN = 24
+
+
+@pytest.fixture(autouse=True)
+def no_delays(monkeypatch):
+    monkeypatch.setattr(time, 'sleep', lambda secs: None)
+
+
+def frame(epd, seed=0):
+    rnd = random.Random(seed)
+    return bytearray(rnd.getrandbits(8) for _ in range(packing.row_bytes(epd.width) * epd.height))
+
+
+def run(cls, idle, method, args):
+    """
+    Returns the (dc, byte) stream sent by the method and how many writebytes2 calls it took
+    """
+    epd = cls()
+    spidev.reset()
+    GPIO.inputs[BUSY_PIN] = idle
+    getattr(epd, method)(*args(epd))
+    return list(spidev.bus), spidev.calls['writebytes2']
+
+
+def lut(name):
+    return lambda epd: (getattr(epd, name),)
+
+
+def image(epd):
+    return (frame(epd),)
+
+
+def color(epd):
+    return (0xA5,)
+
+
+def nothing(epd):
+    return ()
+
+
+# (driver, reference, busy line level when idle, method, arguments, writebytes2 calls)
+CASES = [
+    (ref.v1.EPD, ref.V1, 0, 'init', lut('lut_full_update'), 1),
+    (ref.v1.EPD, ref.V1, 0, 'init', lut('lut_partial_update'), 1),
+
+    (ref.v1bc.EPD, ref.V1bc, 1, 'displayBlack', image, 1),
+    (ref.v1bc.EPD, ref.V1bc, 1, 'display', lambda epd: (frame(epd, 0), frame(epd, 1)), 2),
+    (ref.v1bc.EPD, ref.V1bc, 1, 'Clear', nothing, 2),
+
+    (ref.v1bcfast.EPD, ref.V1bcFast, 1, 'SetPartReg', nothing, 5),
+    (ref.v1bcfast.EPD, ref.V1bcFast, 1, 'display', image, 2),
+    (ref.v1bcfast.EPD, ref.V1bcFast, 1, 'DisplayPartial', image, 7),
+    (ref.v1bcfast.EPD, ref.V1bcFast, 1, 'Clear', nothing, 2),
+
+    (ref.v154b.EPD, ref.V154b, 1, 'set_lut_bw', nothing, 5),
+    (ref.v154b.EPD, ref.V154b, 1, 'set_lut_red', nothing, 3),
+    (ref.v154b.EPD, ref.V154b, 1, 'display', lambda epd: (frame(epd, 0), frame(epd, 1)), 1),
+    (ref.v154b.EPD, ref.V154b, 1, 'Clear', nothing, 2),
+
+    (ref.v2.EPD, ref.V2, 0, 'init', lambda epd: (epd.FULL_UPDATE,), 1),
+    (ref.v2.EPD, ref.V2, 0, 'init', lambda epd: (epd.PART_UPDATE,), 1),
+    (ref.v2.EPD, ref.V2, 0, 'display', image, 1),
+    (ref.v2.EPD, ref.V2, 0, 'displayPartial', image, 2),
+    (ref.v2.EPD, ref.V2, 0, 'Clear', color, 1),
+
+    (ref.v213bc.EPD, ref.V213bc, 1, 'SetFullReg', nothing, 5),
+    (ref.v213bc.EPD, ref.V213bc, 1, 'display', lambda epd: (frame(epd, 0), frame(epd, 1)), 2),
+    (ref.v213bc.EPD, ref.V213bc, 1, 'pwndisplay', image, 7),
+    (ref.v213bc.EPD, ref.V213bc, 1, 'Clear', nothing, 2),
+    (ref.v213bc.EPD, ref.V213bc, 1, 'pwnclear', nothing, 7),
+
+    (ref.v213d.EPD, ref.V213d, 1, 'SetFullReg', nothing, 5),
+    (ref.v213d.EPD, ref.V213d, 1, 'SetPartReg', nothing, 5),
+    (ref.v213d.EPD, ref.V213d, 1, 'display', image, 7),
+    (ref.v213d.EPD, ref.V213d, 1, 'DisplayPartial', image, 7),
+    (ref.v213d.EPD, ref.V213d, 1, 'Clear', nothing, 7),
+
+    (ref.v27.EPD, ref.V27, 1, 'set_lut', nothing, 5),
+    (ref.v27.EPD, ref.V27, 1, 'gray_SetLut', nothing, 6),
+    (ref.v27.EPD, ref.V27, 1, 'display', image, 2),
+    (ref.v27.EPD, ref.V27, 1, 'Clear', color, 2),
+
+    (ref.v29.EPD, ref.V29, 0, 'init', lut('lut_full_update'), 1),
+    (ref.v29.EPD, ref.V29, 0, 'init', lut('lut_partial_update'), 1),
+
+    (ref.v3.EPD, ref.V3, 0, 'Lut', lut('lut_full_update'), 1),
+    (ref.v3.EPD, ref.V3, 0, 'display', image, 1),
+    (ref.v3.EPD, ref.V3, 0, 'displayPartial', image, 2),
+    (ref.v3.EPD, ref.V3, 0, 'displayPartBaseImage', image, 2),
+    (ref.v3.EPD, ref.V3, 0, 'Clear', color, 1),
+]
+
+
+@pytest.mark.parametrize('driver,reference,idle,method,args,transfers', CASES,
+                         ids=['%s.%s-%d' % (case[1].__name__, case[3], i) for i, case in enumerate(CASES)])
+def test_same_stream_as_per_byte(driver, reference, idle, method, args, transfers):
+    sent, calls = run(driver, idle, method, args)
+    expected, _ = run(reference, idle, method, args)
+
+    assert len(sent) == len(expected)
+    assert sent == expected
+    assert calls == transfers
+
+
+def commands(stream):
+    """
+    Splits the (dc, byte) stream in (command, data) tuples
+    """
+    cmds = []
+    for dc, byte in stream:
+        if dc == 0:
+            cmds.append((byte, []))
+        else:
+            cmds[-1][1].append(byte)
+    return cmds
+
+
+def ram(cmds):
+    """
+    What the controller ends up with in its RAM, in data entry mode 0x03: the X counter
+    goes back to the start of the window and Y moves to the next row once X is past its end
+    """
+    mem = {}
+    x_start = x_end = x = y = 0
+    for cmd, data in cmds:
+        if cmd == 0x44:
+            x_start, x_end = data
+        elif cmd == 0x4E:
+            x = data[0]
+        elif cmd == 0x4F:
+            y = data[0] | data[1] << 8
+        elif cmd == 0x24:
+            for byte in data:
+                mem[(x, y)] = byte
+                x += 1
+                if x > x_end:
+                    x, y = x_start, y + 1
+    return mem
+
+
+# (driver, reference, method, arguments), these write the whole frame with one transfer
+# instead of one per row, so only what ends up in the panel RAM is the same
+BULK_CASES = [
+    (ref.v1.EPD, ref.V1, 'display', image),
+    (ref.v1.EPD, ref.V1, 'Clear', color),
+    (ref.v29.EPD, ref.V29, 'display', image),
+    (ref.v29.EPD, ref.V29, 'Clear', color),
+]
+
+
+@pytest.mark.parametrize('driver,reference,method,args', BULK_CASES,
+                         ids=['%s.%s' % (case[1].__name__, case[2]) for case in BULK_CASES])
+def test_same_ram_as_per_row(driver, reference, method, args):
+    sent, calls = run(driver, 0, method, args)
+    expected, _ = run(reference, 0, method, args)
+
+    epd = driver()
+    assert len(ram(commands(expected))) == packing.row_bytes(epd.width) * epd.height
+    assert ram(commands(sent)) == ram(commands(expected))
+    # everything but the addressing is sent as it was
+    other = lambda cmds: [c for c in cmds if c[0] not in (0x4E, 0x4F, 0x24)]
+    assert other(commands(sent)) == other(commands(expected))
+    assert calls == 1
+
+
+def test_fake_bus_records_dc():
+    epd = ref.v3.EPD()
+    spidev.reset()
+    epd.send_command(0x24)
+    epd.send_data2(bytes([1, 2]))
+    epd.send_data(~0x0F)
+    assert spidev.bus == [(0, 0x24), (1, 1), (1, 2), (1, 0xF0)]
+    assert spidev.calls == {'writebytes': 2, 'writebytes2': 1}
@@ -0,0 +1,277 @@
+import random
+
+import pytest
+from PIL import Image
+
+from pwnagotchi.ui.hw.libs import packing
+
+
+# the getbuffer loops the drivers used before pwnagotchi.ui.hw.libs.packing, kept as they were
+
+def ref_pack(image, width, height):
+    # waveshare v1 2.13
+    if width % 8 == 0:
+        linewidth = int(width / 8)
+    else:
+        linewidth = int(width / 8) + 1
+
+    buf = [0xFF] * (linewidth * height)
+    image_monocolor = image.convert('1')
+    imwidth, imheight = image_monocolor.size
+    pixels = image_monocolor.load()
+
+    if imwidth == width and imheight == height:
+        for y in range(imheight):
+            for x in range(imwidth):
+                if pixels[x, y] == 0:
+                    buf[int(x / 8) + y * linewidth] &= ~(0x80 >> (x % 8))
+    elif imwidth == height and imheight == width:
+        for y in range(imheight):
+            for x in range(imwidth):
+                newx = y
+                newy = height - x - 1
+                if pixels[x, y] == 0:
+                    buf[int(newx / 8) + newy * linewidth] &= ~(0x80 >> (y % 8))
+    return buf
+
+
+def ref_pack_flat(image, width, height):
+    # waveshare 2.13bc, 2.13d, 2.7, 2.9 and 1.54b
+    buf = [0xFF] * (int(width / 8) * height)
+    image_monocolor = image.convert('1')
+    imwidth, imheight = image_monocolor.size
+    pixels = image_monocolor.load()
+    if imwidth == width and imheight == height:
+        for y in range(imheight):
+            for x in range(imwidth):
+                if pixels[x, y] == 0:
+                    buf[int((x + y * width) / 8)] &= ~(0x80 >> (x % 8))
+    elif imwidth == height and imheight == width:
+        for y in range(imheight):
+            for x in range(imwidth):
+                newx = y
+                newy = height - x - 1
+                if pixels[x, y] == 0:
+                    buf[int((newx + newy * width) / 8)] &= ~(0x80 >> (y % 8))
+    return buf
+
+
+def ref_pack_mirrored(image, width, height):
+    # waveshare v2 2.13 and the dfrobot panels
+    if width % 8 == 0:
+        linewidth = width // 8
+    else:
+        linewidth = width // 8 + 1
+
+    buf = [0xFF] * (linewidth * height)
+    image_monocolor = image.convert('1')
+    imwidth, imheight = image_monocolor.size
+    pixels = image_monocolor.load()
+
+    if imwidth == width and imheight == height:
+        for y in range(imheight):
+            for x in range(imwidth):
+                if pixels[x, y] == 0:
+                    x = imwidth - x
+                    buf[x // 8 + y * linewidth] &= ~(0x80 >> (x % 8))
+    elif imwidth == height and imheight == width:
+        for y in range(imheight):
+            for x in range(imwidth):
+                newx = y
+                newy = height - x - 1
+                if pixels[x, y] == 0:
+                    newy = imwidth - newy - 1
+                    buf[newx // 8 + newy * linewidth] &= ~(0x80 >> (y % 8))
+    return buf
+
+
+def ref_pack_pages(image, width, height):
+    # SH1106, the rotated branch is left out as it set the bits by source row
+    buf = [0xFF] * ((width // 8) * height)
+    image_monocolor = image.convert('1')
+    imwidth, imheight = image_monocolor.size
+    pixels = image_monocolor.load()
+    if imwidth == width and imheight == height:
+        for y in range(imheight):
+            for x in range(imwidth):
+                if pixels[x, y] == 0:
+                    buf[x + (y // 8) * width] &= ~(1 << (y % 8))
+    return buf
+
+
+def ref_ssd1306(image, width, height):
+    # SSD1306.image()
+    pages = height // 8
+    buf = [0] * (width * pages)
+    pix = image.load()
+    index = 0
+    for page in range(pages):
+        for x in range(width):
+            bits = 0
+            for bit in [0, 1, 2, 3, 4, 5, 6, 7]:
+                bits = bits << 1
+                bits |= 0 if pix[(x, page * 8 + 7 - bit)] == 0 else 1
+            buf[index] = bits
+            index += 1
+    return buf
+
+
+def as_bytes(buf):
+    return bytes(b & 0xFF for b in buf)
+
+
+def canvas(size, seed, mode='1'):
+    rnd = random.Random(seed)
+    if mode == '1':
+        return Image.frombytes('1', size, bytes(rnd.getrandbits(8) for _ in range(packing.row_bytes(size[0]) * size[1])))
+    return Image.frombytes('L', size, bytes(rnd.getrandbits(8) for _ in range(size[0] * size[1])))
+
+
+PANELS = [
+    ('waveshare_1', 122, 250, packing.pack, ref_pack),
+    ('waveshare213bc', 104, 212, packing.pack, ref_pack_flat),
+    ('waveshare27inch', 176, 264, packing.pack, ref_pack_flat),
+    ('waveshare29inch', 128, 296, packing.pack, ref_pack_flat),
+    ('waveshare154inch', 200, 200, packing.pack, ref_pack_flat),
+    ('waveshare_2', 122, 250, packing.pack_mirrored, ref_pack_mirrored),
+    ('dfrobot', 122, 250, packing.pack_mirrored, ref_pack_mirrored),
+]
+
+
+@pytest.mark.parametrize('name,width,height,pack,ref', PANELS, ids=[p[0] for p in PANELS])
+@pytest.mark.parametrize('rotated', [False, True], ids=['portrait', 'landscape'])
+@pytest.mark.parametrize('seed', [0, 1, 2])
+def test_pack_matches_loops(name, width, height, pack, ref, rotated, seed):
+    size = (height, width) if rotated else (width, height)
+    img = canvas(size, seed)
+    assert bytes(pack(img, width, height)) == as_bytes(ref(img, width, height))
+
+
+@pytest.mark.parametrize('name,width,height,pack,ref', PANELS, ids=[p[0] for p in PANELS])
+def test_pack_converts_like_loops(name, width, height, pack, ref):
+    img = canvas((height, width), 42, mode='L')
+    assert bytes(pack(img, width, height)) == as_bytes(ref(img, width, height))
+
+
+@pytest.mark.parametrize('name,width,height,pack,ref', PANELS, ids=[p[0] for p in PANELS])
+@pytest.mark.parametrize('fill', [0, 1])
+def test_pack_solid(name, width, height, pack, ref, fill):
+    img = Image.new('1', (width, height), fill)
+    assert bytes(pack(img, width, height)) == as_bytes(ref(img, width, height))
+
+
+@pytest.mark.parametrize('name,width,height,pack,ref', PANELS, ids=[p[0] for p in PANELS])
+def test_pack_wrong_size(name, width, height, pack, ref):
+    img = canvas((width + 3, height - 5), 0)
+    assert bytes(pack(img, width, height)) == as_bytes(ref(img, width, height))
+    assert set(pack(img, width, height)) == {0xFF}
+
+
+@pytest.mark.parametrize('seed', [0, 1, 2])
+def test_pack_pages_matches_loops(seed):
+    img = canvas((128, 64), seed)
+    assert bytes(packing.pack_pages(img, 128, 64)) == as_bytes(ref_pack_pages(img, 128, 64))
+    assert bytes(packing.pack_pages(img, 128, 64)) == as_bytes(ref_ssd1306(img, 128, 64))
+
+
+def test_pack_pages_rotated():
+    img = canvas((64, 128), 0)
+    expected = ref_ssd1306(img.transpose(Image.ROTATE_90), 128, 64)
+    assert bytes(packing.pack_pages(img, 128, 64)) == as_bytes(expected)
+
+
+def test_pack_pages_wrong_size():
+    img = canvas((100, 50), 0)
+    assert bytes(packing.pack_pages(img, 128, 64)) == as_bytes(ref_pack_pages(img, 128, 64))
+
+
+def test_dirty_pages():
+    old = packing.pack_pages(canvas((128, 64), 0), 128, 64)
+    new = bytearray(old)
+    assert packing.dirty_pages(None, new, 128) == (0, 7)
+    assert packing.dirty_pages(old, new, 128) is None
+    new[2 * 128 + 5] ^= 0xFF
+    new[5 * 128] ^= 0x01
+    assert packing.dirty_pages(old, new, 128) == (2, 5)
+
+
+def test_invert():
+    buf = bytes(range(256))
+    assert packing.invert(buf) == as_bytes(~b for b in buf)
+
+
+def test_crop():
+    width, height = 122, 250
+    stride = packing.row_bytes(width)
+    buf = bytes(random.Random(0).getrandbits(8) for _ in range(stride * height))
+    window = (3, 10, 7, 12)
+    assert packing.crop(buf, width, window) == buf[10 * stride + 3:10 * stride + 8] + \
+        buf[11 * stride + 3:11 * stride + 8] + \
+        buf[12 * stride + 3:12 * stride + 8]
+    assert packing.crop(buf, width, (0, 0, stride - 1, height - 1)) == buf
+
+
+def random_rects(rnd, size, count):
+    rects = []
+    for _ in range(count):
+        w, h = rnd.randint(1, 30), rnd.randint(1, 20)
+        left, top = rnd.randint(-10, size[0] - 1), rnd.randint(-10, size[1] - 1)
+        rects.append((left, top, left + w - 1, top + h - 1))
+    return rects
+
+
+def changed(img, rects, rnd):
+    img = img.copy()
+    for left, top, right, bottom in rects:
+        for y in range(max(top, 0), min(bottom, img.height - 1) + 1):
+            for x in range(max(left, 0), min(right, img.width - 1) + 1):
+                img.putpixel((x, y), rnd.getrandbits(1))
+    return img
+
+
+@pytest.mark.parametrize('mirrored', [False, True], ids=['pack', 'pack_mirrored'])
+@pytest.mark.parametrize('rotated', [False, True], ids=['portrait', 'landscape'])
+@pytest.mark.parametrize('seed', range(10))
+def test_windows_cover_changes(mirrored, rotated, seed):
+    width, height = 122, 250
+    size = (height, width) if rotated else (width, height)
+    pack = packing.pack_mirrored if mirrored else packing.pack
+    rnd = random.Random(seed)
+
+    old = canvas(size, seed)
+    rects = random_rects(rnd, size, rnd.randint(1, 6))
+    new = changed(old, rects, rnd)
+
+    windows = packing.windows(rects, size, width, height, mirrored=mirrored, max_ratio=1.0)
+    assert windows is not None
+
+    # merged windows don't touch each other
+    for i, a in enumerate(windows):
+        for b in windows[i + 1:]:
+            assert not (a[0] <= b[2] + 1 and b[0] <= a[2] + 1 and a[1] <= b[3] + 1 and b[1] <= a[3] + 1)
+
+    # sending only the windows turns the old buffer into the new one
+    stride = packing.row_bytes(width)
+    buf, expected = bytearray(pack(old, width, height)), bytes(pack(new, width, height))
+    for x0, y0, x1, y1 in windows:
+        data = packing.crop(expected, width, (x0, y0, x1, y1))
+        for row in range(y1 - y0 + 1):
+            start = (y0 + row) * stride + x0
+            buf[start:start + x1 - x0 + 1] = data[row * (x1 - x0 + 1):(row + 1) * (x1 - x0 + 1)]
+    assert bytes(buf) == expected
+
+
+def test_windows_whole_buffer():
+    # cheaper to send everything
+    assert packing.windows([(0, 0, 121, 200)], (122, 250), 122, 250) is None
+    # the canvas doesn't fit the panel
+    assert packing.windows([(0, 0, 1, 1)], (100, 100), 122, 250) is None
+
+
+def test_windows_off_screen():
+    assert packing.windows([(-20, -20, -1, -1), (300, 0, 310, 10)], (122, 250), 122, 250) == []
+
+
+def test_windows_merge():
+    windows = packing.windows([(0, 0, 7, 0), (8, 1, 15, 1)], (122, 250), 122, 250)
+    assert windows == [(0, 0, 1, 1)]
@@ -0,0 +1,82 @@
+import base64
+import http.client
+import threading
+import time
+
+import pytest
+from flask import Flask, Response
+from PIL import Image
+
+import pwnagotchi.ui.web as web
+from pwnagotchi.ui.web.handler import Handler
+from pwnagotchi.ui.web.wsgi import PooledWSGIServer
+
+WORKERS = 2
+AUTH = {'Authorization': 'Basic ' + base64.b64encode(b'changeme:changeme').decode()}
+
+
+@pytest.fixture
+def server():
+    app = Flask(__name__)
+    Handler({'username': 'changeme', 'password': 'changeme'}, None, app)
+
+    # stands in for /ui/stream, which never ends on its own
+    @app.route('/stream')
+    def stream():
+        return Response((chunk for chunk in ('retry: 2000\n\n', ': ping\n\n')), mimetype='text/event-stream')
+
+    web.update_frame(Image.new('1', (250, 122), 1))
+    server = PooledWSGIServer('127.0.0.1', 0, app, workers=WORKERS)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def get(conn, path, headers=None):
+    conn.request('GET', path, headers=dict(AUTH, **(headers or {})))
+    response = conn.getresponse()
+    return response, response.read()
+
+
+def settle(server):
+    # workers account for a request, and spare ones leave, only once they're done with the connection
+    deadline = time.time() + 2.0
+    while time.time() < deadline:
+        stats = server.stats()
+        if not stats['active'] and stats['threads'] <= WORKERS:
+            break
+        time.sleep(0.01)
+
+
+def test_revalidations_stay_in_the_pool(server):
+    conn = http.client.HTTPConnection('127.0.0.1', server.server_address[1], timeout=5)
+    response, data = get(conn, '/ui')
+    assert response.status == 200
+    etag = response.getheader('ETag')
+
+    for _ in range(10):
+        response, data = get(conn, '/ui', {'If-None-Match': etag})
+        assert response.status == 304
+        assert data == b''
+    conn.close()
+    settle(server)
+
+    stats = server.stats()
+    assert stats['requests'] == 11
+    assert stats['streams'] == 0
+    assert stats['threads'] == WORKERS
+
+
+def test_streams_are_detached(server):
+    conn = http.client.HTTPConnection('127.0.0.1', server.server_address[1], timeout=5)
+    response, data = get(conn, '/stream')
+    assert response.status == 200
+    assert data == b'retry: 2000\n\n: ping\n\n'
+    conn.close()
+    settle(server)
+
+    stats = server.stats()
+    assert stats['streams'] == 0
+    # the replacement took the place of the worker that served the stream
+    assert stats['threads'] == WORKERS